@@ -8,32 +8,123 @@ https://adventofcode.com/2018/day/1
 Copyright David Hoffman, 2018
 """
 
-import pandas as pd
+import os
+import mmap
+import warnings
 import numpy as np
-import itertools as itt
 
+# (frequency changes, first frequency reached twice)
+test_inputs = (
+    ((+1, -2, +3, +1), 2),
+    ((+1, -1), 0),
+    ((+3, +3, +4, -2, -4), 10),
+    ((-6, +3, +8, +5, -6), 5),
+    ((+7, +7, -2, -7, -4), 14),
+)
 
-# Part 1
 
-# read in data
-freqs = pd.read_csv("input.txt", header=None)[0].values
+def _lines_in(mm, chunk_size):
+    """Count the lines of a memory mapped file"""
+    lines = 0
+    for start in range(0, len(mm), chunk_size):
+        lines += mm[start : start + chunk_size].count(b"\n")
+    # last line may not have a newline
+    return lines + (mm[-1:] != b"\n")
 
-# Part 2
-# set up a set of all frequencies we've seen
-seen_berfore = set()
-# and an accumulator
-accum = 0
 
-# cycle endlessly through frequencies
-for i in itt.cycle(freqs):
-    # updating the accumulator
-    accum += i
-    # checking if it's been seen
-    if accum in seen_berfore:
-        break
-    # updating the set
-    seen_berfore.add(accum)
+def read_freqs(filename, chunk_size=1 << 24):
+    """Stream frequency changes from filename into an int64 array, returns it and its sum
+
+    The file is memory mapped and parsed a chunk (of about chunk_size bytes,
+    ending on a line break) at a time straight into a preallocated array, so
+    memory use is the array plus one chunk and the total comes for free.
+    """
+    if not os.path.getsize(filename):
+        return np.zeros(0, np.int64), 0
+
+    with open(filename, "rb") as fp, mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        freqs = np.empty(_lines_in(mm, chunk_size), np.int64)
+        total = 0
+        filled = 0
+        start = 0
+        while start < len(mm):
+            # finish the chunk at the end of a line
+            stop = mm.rfind(b"\n", start, start + chunk_size) + 1
+            if stop <= start:
+                # a line longer than a chunk, or the end of the file
+                stop = mm.find(b"\n", start + chunk_size) + 1 or len(mm)
+            data = mm[start:stop]
+            start = stop
+            if not data.strip():
+                continue
+            with warnings.catch_warnings():
+                # numpy only warns when it can't parse something
+                warnings.simplefilter("error", DeprecationWarning)
+                try:
+                    chunk = np.fromstring(data, dtype=np.int64, sep=" ")
+                except DeprecationWarning:
+                    raise ValueError("Bad frequency in {!r}".format(data[:80]))
+            freqs[filled : filled + len(chunk)] = chunk
+            total += int(chunk.sum())
+            filled += len(chunk)
+
+    # blank lines take up space but don't give numbers
+    return freqs[:filled], total
+
+
+def first_repeat(freqs):
+    """The first frequency reached twice when cycling through freqs, None if there isn't one
+
+    Instead of cycling, note that the frequency reached after k full passes and
+    i more changes is sums[i] + k * drift where sums are the running sums of
+    the first pass (starting at 0) and drift is the total. So a later pass can
+    only hit sums[j] from sums[i] if they're congruent modulo drift, and it
+    does so after (sums[j] - sums[i]) / drift passes. Sorting the sums by
+    residue and value puts each sum next to the one it reaches first, which
+    makes this O(n log n) however many passes it takes.
+    """
+    freqs = np.asarray(freqs, dtype=np.int64)
+    n = len(freqs)
+    if not n:
+        return None
+    sums = np.concatenate(([0], np.cumsum(freqs)[:-1]))
+    drift = int(sums[-1] + freqs[-1])
+
+    # a repeat in the first pass beats anything later
+    order = np.argsort(sums, kind="stable")
+    repeats = order[1:][sums[order[1:]] == sums[order[:-1]]]
+    if len(repeats):
+        return int(sums[repeats.min()])
+
+    if drift == 0:
+        # we're back at the start after one pass
+        return 0
+
+    # work with a positive drift, flip back at the end
+    sign = 1 if drift > 0 else -1
+    sums *= sign
+    drift *= sign
+
+    order = np.lexsort((sums, sums % drift))
+    sorted_sums = sums[order]
+    same_residue = (sorted_sums[1:] - sorted_sums[:-1]) % drift == 0
+    if not same_residue.any():
+        # the passes never overlap
+        return None
+
+    # passes needed for each sum to reach the next one up and when that happens
+    passes = (sorted_sums[1:] - sorted_sums[:-1])[same_residue] // drift
+    times = passes * n + order[:-1][same_residue]
+    return sign * int(sorted_sums[1:][same_residue][times.argmin()])
+
 
 if __name__ == "__main__":
-    print("Answer 1:", freqs.sum())
-    print("Answer 2:", accum)
+    for freqs, result in test_inputs:
+        assert first_repeat(freqs) == result, freqs
+
+    # Part 1
+    freqs, total = read_freqs("input.txt")
+    print("Answer 1:", total)
+
+    # Part 2
+    print("Answer 2:", first_repeat(freqs))
@@ -8,38 +8,120 @@ https://adventofcode.com/2018/day/2
 Copyright David Hoffman, 2018
 """
 
-import pandas as pd
+import os
+import sys
 import numpy as np
-import itertools as itt
+from collections import defaultdict
 
-# Part 1
+# shared code lives in the aoc package at the root of the repository
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from aoc.lazy import read_lines  # noqa: E402
 
-# read in data
-strings = pd.read_csv("input.txt", header=None)[0].values
+# Part 1
+# ids are processed this many at a time so the histograms stay small
+CHUNK_SIZE = 1 << 16
 
-# convert characters to numbers
-chars = np.array([np.array(s, "c").view("uint8") for s in strings])
 
-# calculate counts of chars
-counts = [np.bincount(char) for char in chars]
+def id_matrix(ids):
+    """All ids as one uint8 matrix, one row per id, shorter ids padded with zeros"""
+    length = max(len(id_) for id_ in ids)
+    return np.array(ids, "S{}".format(length)).view(np.uint8).reshape(len(ids), length)
 
-# calculate counts of counts
-counts_of_counts = [np.bincount(count, minlength=10) for count in counts]
 
-# figure out which strings have characters that appear in duplicate
-twos = [count[2] > 0 for count in counts_of_counts]
+def checksum(chars, chunk_size=CHUNK_SIZE):
+    """The number of rows with a letter exactly twice times those with a letter exactly three times"""
+    # number the letters that occur 0 .. k - 1, the padding becomes k
+    lut = np.zeros(256, np.intp)
+    letters = np.flatnonzero(np.bincount(chars.ravel(), minlength=256)[1:]) + 1
+    k = len(letters)
+    lut[:] = k
+    lut[letters] = np.arange(k)
 
-# figure out which strings have characters that appear in triplicate
-threes = [count[3] > 0 for count in counts_of_counts]
+    twos = threes = 0
+    for start in range(0, len(chars), chunk_size):
+        codes = lut[chars[start : start + chunk_size]]
+        n = len(codes)
+        # offset each row into its own block of k + 1 bins and count everything at once
+        codes += (np.arange(n) * (k + 1))[:, None]
+        counts = np.bincount(codes.ravel(), minlength=n * (k + 1)).reshape(n, k + 1)[:, :k]
+        twos += np.count_nonzero((counts == 2).any(1))
+        threes += np.count_nonzero((counts == 3).any(1))
+    return twos * threes
 
 
 # Part 2
-# find the strings that differ by at most 1 character
-for i, j in itt.combinations(chars, 2):
-    if sum(i == j) == 25:
-        break
+# multiplier for polynomial hashes of ids, arithmetic wraps around at 2**64
+HASH_BASE = np.uint64(0x100000001B3)
+
+
+def _near_duplicates_same_length(ids, members):
+    """near_duplicates for ids[members], which all have the same length"""
+    length = len(ids[members[0]])
+    # one row of code points per id
+    chars = np.array([ids[i] for i in members], "U{}".format(length)).view(np.uint32)
+    chars = chars.reshape(len(members), length).astype(np.uint64)
+    powers = np.cumprod(np.full(length, HASH_BASE, np.uint64))
+    hashes = (chars * powers).sum(1)
+
+    pairs = []
+    for position in range(length):
+        # hash with this position cut out
+        masked = hashes - chars[:, position] * powers[position]
+        cut = chars[:, position]
+        # runs of equal hashes are candidates, grouped by the letter that was cut
+        # out, identical ids share a group and only pairs across groups can match
+        order = np.lexsort((cut, masked))
+        masked, cut = masked[order], cut[order]
+        new_run = np.diff(masked, prepend=masked[0] ^ 1) != 0
+        new_group = new_run | (np.diff(cut, prepend=cut[0] ^ 1) != 0)
+        if new_run.all():
+            continue
+        run_ends = np.append(np.flatnonzero(new_run)[1:], len(order))
+        group_ends = np.append(np.flatnonzero(new_group)[1:], len(order))
+        run_end = run_ends[np.cumsum(new_run) - 1]
+        group_end = group_ends[np.cumsum(new_group) - 1]
+        # every id pairs with the rest of its run after its own group
+        counts = run_end - group_end
+        a = np.repeat(np.arange(len(order)), counts)
+        b = group_end[a] + np.arange(counts.sum()) - (np.cumsum(counts) - counts)[a]
+        a, b = order[a], order[b]
+        # check, hashes can collide
+        real = (chars[a] != chars[b]).sum(1) == 1
+        a, b = members[a[real]], members[b[real]]
+        pairs += zip(np.minimum(a, b).tolist(), np.maximum(a, b).tolist(), [position] * len(a))
+    return pairs
+
+
+def near_duplicates(ids):
+    """Find all pairs of ids that differ by exactly one character
+
+    Returns a sorted list of (i, j, position) with i < j indexing ids. Two ids
+    differ only at position exactly when they're the same once that position
+    is cut out, so hashing every id with each position cut out in turn and
+    sorting the hashes finds all the pairs in L passes over the ids rather
+    than comparing all O(n^2) pairs. Within a run of equal hashes the ids
+    are grouped by the letter that was cut out and only paired across
+    groups, so repeated ids cost nothing and the work is O(n L) plus the
+    pairs found. Ids of different lengths never match.
+    """
+    by_length = defaultdict(list)
+    for i, id_ in enumerate(ids):
+        by_length[len(id_)].append(i)
+
+    pairs = []
+    for length, members in by_length.items():
+        if length and len(members) > 1:
+            pairs += _near_duplicates_same_length(ids, np.array(members))
+    return sorted(pairs)
+
+
+def common_letters(id_, position):
+    """The letters of id_ that are left after cutting out position"""
+    return id_[:position] + id_[position + 1 :]
 
 
 if __name__ == "__main__":
-    print("Answer 1:", sum(twos) * sum(threes))
-    print("Answer 2:", "".join(i.view("c").astype("str")[i == j]))
+    strings = read_lines("input.txt")
+    print("Answer 1:", checksum(id_matrix(strings)))
+    i, j, position = near_duplicates(strings)[0]
+    print("Answer 2:", common_letters(strings[i], position))
@@ -8,54 +8,207 @@ https://adventofcode.com/2018/day/3
 Copyright David Hoffman, 2018
 """
 
-import pandas as pd
 import numpy as np
-import scipy.ndimage as ndi
 import re
 
+# one parsed claim
+CLAIM = np.dtype(
+    [
+        ("id", np.int64),
+        ("left", np.int64),
+        ("top", np.int64),
+        ("width", np.int64),
+        ("height", np.int64),
+    ]
+)
 
-def data():
-    """A generator yielding parsed data as slices"""
-    with open("input.txt", "r") as file:
-        for line in file:
-            numbers = re.findall(r"\d+", line)
-            left, top, width, height = [int(num) for num in numbers[1:]]
-            yield (slice(top, top + height), slice(left, left + width))
 
+def read_claims(filename="input.txt"):
+    """Parse all claims at once into a structured array"""
+    with open(filename, "r") as file:
+        numbers = np.array(re.findall(r"\d+", file.read()), np.int64)
+    return numbers.reshape(-1, len(CLAIM.names)).view(CLAIM).squeeze(1)
 
-if __name__ == "__main__":
-    # Part 1
-    # Make empty fabric
-    fabric = np.zeros((1000, 1000))
 
-    # fill in claims
-    for d in data():
-        fabric[d] += 1
+def paint(claims):
+    """The number of claims covering each square inch of the smallest fabric that holds them all
 
-    # sum any area with more than one claim
-    print("Answer 1:", (fabric > 1).sum())
+    Each claim only marks its four corners in a difference array, two
+    cumulative sums then turn the corners into the coverage.
+    """
+    bottom = claims["top"] + claims["height"]
+    right = claims["left"] + claims["width"]
+    shape = (bottom.max(initial=0) + 1, right.max(initial=0) + 1)
+    # coverage and the partial sums stay within +/- the number of claims, so keep
+    # the array small, a signed type that holds -(n + 1) holds +n too
+    dtype = np.min_scalar_type(-len(claims) - 1)
+    diff = np.zeros(shape, dtype)
+    np.add.at(diff, (claims["top"], claims["left"]), 1)
+    np.add.at(diff, (claims["top"], right), -1)
+    np.add.at(diff, (bottom, claims["left"]), -1)
+    np.add.at(diff, (bottom, right), 1)
+    np.cumsum(diff, 0, dtype=dtype, out=diff)
+    np.cumsum(diff, 1, dtype=dtype, out=diff)
+    return diff[:-1, :-1]
 
-    # Part 2
-    # label claims
-    lbl, nlbl = ndi.label(fabric)
-    lbls = np.arange(1, nlbl + 1)
 
-    # figure out which square inch has more than one claim
-    max_values = ndi.labeled_comprehension(fabric, lbl, lbls, np.max, int, 0)
+def lonely_claims(claims, fabric):
+    """The ids of all claims that don't overlap any other claim
+
+    A summed area table of the over claimed square inches gives the number
+    of them under each claim with four lookups.
+    """
+    overlap = fabric > 1
+    sat = np.zeros((overlap.shape[0] + 1, overlap.shape[1] + 1), np.min_scalar_type(overlap.size))
+    np.cumsum(overlap, 0, dtype=sat.dtype, out=sat[1:, 1:])
+    np.cumsum(sat[1:, 1:], 1, dtype=sat.dtype, out=sat[1:, 1:])
+    top, left = claims["top"], claims["left"]
+    bottom, right = top + claims["height"], left + claims["width"]
+    # add before subtracting so unsigned sums never go below zero
+    under = (sat[bottom, right] + sat[top, left]) - (sat[top, right] + sat[bottom, left])
+    return claims["id"][under == 0]
+
+
+def _spans(lo, hi):
+    """Every (row, k) with lo[row] <= k < hi[row], as two flat arrays"""
+    counts = np.maximum(hi - lo, 0)
+    rows = np.repeat(np.arange(len(lo)), counts)
+    starts = np.cumsum(counts) - counts
+    return rows, lo[rows] + np.arange(counts.sum()) - starts[rows]
+
+
+def _chunks(counts, chunk_size):
+    """Slices splitting counts into consecutive runs adding up to about chunk_size each"""
+    starts = np.cumsum(counts) - counts
+    edges = np.flatnonzero(np.diff(starts // chunk_size, prepend=-1))
+    return [slice(a, b) for a, b in zip(edges, np.append(edges[1:], len(counts)))]
+
+
+class _Strips(object):
+    """Claims of about the same size bucketed into vertical strips and sorted by top edge
+
+    The strips are as wide as the biggest claim, so a claim can only reach a
+    rectangle if it starts in one of the strips under the rectangle or the
+    one before, and less than the tallest claim above it. Those claims are
+    contiguous runs of the sorted keys, found by binary search.
+    """
+
+    def __init__(self, claims, chunk_size):
+        self.strip_width = max(claims["width"].max(initial=0), claims["height"].max(initial=0), 1)
+        self.max_height = claims["height"].max(initial=0)
+        # room for every top edge in a strip
+        self.strip_size = (claims["top"] + claims["height"]).max(initial=0) + 1
+        keys = (claims["left"] // self.strip_width) * self.strip_size + claims["top"]
+        order = np.argsort(keys, kind="stable")
+        self.keys = keys[order]
+        self.claims = claims[order]
+        self.left = self.claims["left"]
+        self.right = self.left + self.claims["width"]
+        self.top = self.claims["top"]
+        self.bottom = self.top + self.claims["height"]
+        self.chunk_size = chunk_size
+
+    def candidates(self, rects):
+        """Yield (rect, claim) index pairs that intersect, rects as columns
+
+        The work is split so that no chunk has much more than chunk_size
+        strips or candidate claims in it, however big the rectangles are.
+        """
+        left, top, width, height = rects
+        right, bottom = left + width, top + height
+        first = np.maximum(left // self.strip_width - 1, 0)
+        last = (right - 1) // self.strip_width
+        for rows in _chunks(np.maximum(last + 1 - first, 0), self.chunk_size):
+            r, strip = _spans(first[rows], last[rows] + 1)
+            r += rows.start
+            # tops between the tallest claim above and the bottom, without leaving the strip
+            low = np.maximum(top[r] - self.max_height, -1)
+            high = np.minimum(bottom[r], self.strip_size)
+            lo = np.searchsorted(self.keys, strip * self.strip_size + low, "right")
+            hi = np.searchsorted(self.keys, strip * self.strip_size + high, "left")
+            for windows in _chunks(hi - lo, self.chunk_size):
+                s, c = _spans(lo[windows], hi[windows])
+                w = r[windows][s]
+                keep = (self.left[c] < right[w]) & (self.right[c] > left[w])
+                keep &= (self.top[c] < bottom[w]) & (self.bottom[c] > top[w])
+                yield w[keep], c[keep]
 
-    # find the single area that is not over claimed
-    index = np.argwhere(max_values == 1).squeeze()
-    good_square = np.argwhere(lbl == index + 1)
 
-    # get the top left corner which will uniquely identify it
-    top, left = good_square.min(0)
+class ClaimIndex(object):
+    """Claims split by size class and bucketed into strips, for overlap queries
 
-    # find the number of the claim.
-    for i, d in enumerate(data()):
-        s0, s1 = d
-        top_test = s0.start
-        left_test = s1.start
-        if top == top_test and left == left_test:
-            break
+    Claims go into classes by their longest side rounded up to a power of
+    two and each class gets strips and a search window to suit its own
+    claims, so a few huge claims don't make every query look at everything.
+    A query then only looks at the claims of each class near the rectangle,
+    a little more than the claims it hits. Batches are done in chunks to
+    keep the candidate arrays small.
+    """
 
-    print("Answer 2:", i + 1)
+    def __init__(self, claims, chunk_size=1 << 16):
+        size = np.maximum(np.maximum(claims["width"], claims["height"]), 1)
+        size_class = np.frexp(size)[1]
+        self.classes = [_Strips(claims[size_class == k], chunk_size) for k in np.unique(size_class)]
+        self.claims = claims
+        self.chunk_size = chunk_size
+
+    def query(self, rects):
+        """The claims intersecting each of rects, an (n, 4) array of left, top, width, height
+
+        Returns the index of the rectangle and the claim id of every hit,
+        ordered by rectangle.
+        """
+        rects = np.asarray(rects, np.int64).reshape(-1, 4)
+        hits = [(np.zeros(0, np.intp), np.zeros(0, np.int64))]
+        for start in range(0, len(rects), self.chunk_size):
+            columns = rects[start : start + self.chunk_size].T
+            for strips in self.classes:
+                for r, c in strips.candidates(columns):
+                    hits.append((r + start, strips.claims["id"][c]))
+        r, ids = (np.concatenate(a) for a in zip(*hits))
+        order = np.lexsort((ids, r))
+        return r[order], ids[order]
+
+    def intersecting(self, left, top, width, height):
+        """The ids of the claims intersecting one rectangle"""
+        return self.query([(left, top, width, height)])[1]
+
+    def overlapping(self, claim_id):
+        """The ids of the other claims overlapping claim_id"""
+        claim = self.claims[self.claims["id"] == claim_id][0]
+        ids = self.intersecting(claim["left"], claim["top"], claim["width"], claim["height"])
+        return ids[ids != claim_id]
+
+    def overlapping_pairs(self):
+        """All pairs of overlapping claim ids, smaller id first, sorted
+
+        Each class is only checked against itself and the bigger classes, so
+        every pair is found once from its smaller claim.
+        """
+        pairs = [np.zeros((0, 2), np.int64)]
+        for i, small in enumerate(self.classes):
+            for big in self.classes[i:]:
+                for start in range(0, len(small.claims), self.chunk_size):
+                    chunk = small.claims[start : start + self.chunk_size]
+                    columns = (chunk["left"], chunk["top"], chunk["width"], chunk["height"])
+                    for r, c in big.candidates(columns):
+                        if big is small:
+                            # within a class every pair is found from both ends, keep one
+                            keep = c > r + start
+                            r, c = r[keep], c[keep]
+                        a, b = chunk["id"][r], big.claims["id"][c]
+                        pairs.append(np.stack((np.minimum(a, b), np.maximum(a, b)), 1))
+        pairs = np.concatenate(pairs)
+        return pairs[np.lexsort(pairs.T[::-1])]
+
+
+if __name__ == "__main__":
+    # Part 1
+    claims = read_claims()
+    fabric = paint(claims)
+
+    # sum any area with more than one claim
+    print("Answer 1:", (fabric > 1).sum())
+
+    # Part 2
+    print("Answer 2:", *lonely_claims(claims, fabric))
@@ -8,69 +8,179 @@ https://adventofcode.com/2018/day/4
 Copyright David Hoffman, 2018
 """
 
-import pandas as pd
+import os
+import sys
 import numpy as np
-import re
-from datetime import datetime
 
-
-def parse_line(line):
-    """Parse a line from input into date and string"""
-    date, string = [a.replace("[", "") for a in line.split("]")]
-    date = datetime.strptime(date, "%Y-%m-%d %H:%M")
-    return date, string
-
-
-def data():
-    """A generator yielding parsed data as slices"""
-    with open("input.txt", "r") as file:
-        for line in file:
-            yield parse_line(line)
-
-
-def convert_minutes(minutes):
-    awake = np.ones(60, dtype=bool)
-    for i, minute in enumerate(minutes):
-        awake[minute:] = i % 2
-    return awake
-
-
-if __name__ == "__main__":
-    df = pd.DataFrame([d for d in data()], columns=("date", "string")).sort_values("date")
-    list_of_guards = []
-    minutes = None
-    for i, date, string in df.itertuples():
-        if "Guard" in string:
-            if minutes is not None:
-                list_of_guards.append((guard_num, minutes))
-
-            guard_num = int(re.findall(r"\d+", string)[0])
-            minutes = []
-        else:
-            minutes.append(date.minute)
-
-    # minutes asleep are the opposite of minutes awake
-    df2 = pd.DataFrame(
-        [
-            (l[0], l[1], convert_minutes(l[1]), (~convert_minutes(l[1])).sum())
-            for l in list_of_guards
-        ],
-        columns=("guard_num", "points", "awake", "sleep_time"),
+# shared code lives in the aoc package at the root of the repository
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from aoc import cache  # noqa: E402
+
+# the first letter of each kind of event
+BEGINS, FALLS_ASLEEP, WAKES_UP = b"Gfw"
+# "[1518-11-01 00:00] Guard #10 begins shift", fields are found by position
+YEAR, MONTH, DAY, HOUR, MINUTE = (
+    slice(1, 5),
+    slice(6, 8),
+    slice(9, 11),
+    slice(12, 14),
+    slice(15, 17),
+)
+EVENT = 19
+GUARD = 26
+# longest guard number
+GUARD_DIGITS = 10
+
+
+def _field(buf, starts, field):
+    """The number in columns field of every line starting at starts"""
+    value = np.zeros(len(starts), np.int64)
+    for column in range(field.start, field.stop):
+        value = value * 10 + buf[starts + column] - ord("0")
+    return value
+
+
+def _guard_numbers(buf, starts):
+    """The guard numbers of the lines starting at starts, they end at the first non digit"""
+    digits = buf[starts[:, None] + GUARD + np.arange(GUARD_DIGITS)]
+    is_digit = np.cumprod((digits >= ord("0")) & (digits <= ord("9")), 1, dtype=bool)
+    places = is_digit.sum(1, keepdims=True) - 1 - np.arange(GUARD_DIGITS)
+    powers = 10 ** np.arange(GUARD_DIGITS, dtype=np.int64)
+    return np.where(is_digit, (digits - ord("0")) * powers[np.maximum(places, 0)], 0).sum(1)
+
+
+def parse(input_):
+    """Parse the whole log at once by reading the fixed width fields straight out of the bytes
+
+    Returns a sort key, the minute and the first letter of the event for
+    every line, and the guard number (0 unless a shift begins).
+    """
+    raw = input_.encode()
+    if not raw.endswith(b"\n"):
+        raw += b"\n"
+    # pad so that guard numbers can be read past the end
+    buf = np.frombuffer(raw + b" " * (GUARD + GUARD_DIGITS), np.uint8)
+    ends = np.flatnonzero(buf[: len(raw)] == ord("\n"))
+    starts = np.concatenate(([0], ends[:-1] + 1))
+    # skip blank lines
+    starts = starts[ends - starts > EVENT]
+    if not ((buf[starts] == ord("[")) & (buf[starts + MINUTE.stop] == ord("]"))).all():
+        raise ValueError("Log lines must start with [YYYY-MM-DD HH:MM]")
+
+    year, month, day, hour, minute = (
+        _field(buf, starts, f) for f in (YEAR, MONTH, DAY, HOUR, MINUTE)
     )
+    # not minutes since anything, but in the same order
+    key = (((year * 12 + month) * 31 + day) * 24 + hour) * 60 + minute
+    event = buf[starts + EVENT]
+    guard = np.zeros(len(starts), np.int64)
+    guard[event == BEGINS] = _guard_numbers(buf, starts[event == BEGINS])
+    return key, minute, event, guard
+
+
+def naps(key, minute, event, guard):
+    """Sort the log and split it into shifts and the naps taken on them
+
+    Returns the guard on each shift and, for every fall asleep (+1) or wake
+    up (-1), the shift, the minute and the change.
+    """
+    order = np.argsort(key)
+    minute, event, guard = minute[order], event[order], guard[order]
+    is_guard = event == BEGINS
+    # events before the first shift belong to nobody
+    shift = np.cumsum(is_guard) - 1
+    nap = ~is_guard & (shift >= 0)
+    change = np.where(event[nap] == FALLS_ASLEEP, 1, -1).astype(np.int8)
+    return guard[is_guard], shift[nap], minute[nap], change
+
+
+class GuardStats(object):
+    """How often each guard has been asleep in each minute, kept up to date as the log grows
+
+    Falling asleep and waking up are kept as +1/-1 changes per guard and
+    minute, so new events are merged in with one bincount and the minute
+    histograms are a cumulative sum away. Events must arrive no earlier than
+    the ones already merged, the events at the start of a batch belong to
+    the shift that was going on at the end of the last one. A guard who is
+    still asleep counts as asleep until the end of the hour.
+    """
+
+    def __init__(self):
+        self.guard_nums = np.zeros(0, np.int64)
+        self.changes = np.zeros((0, 61), np.int64)
+        # the guard on the last shift seen (0 for none yet) and the key of the last event
+        self.current = 0
+        self.last_key = np.iinfo(np.int64).min
+
+    def _rows(self, guards):
+        """The rows of guards, adding any new guards"""
+        new = np.setdiff1d(guards, self.guard_nums)
+        if len(new):
+            guard_nums = np.union1d(self.guard_nums, new)
+            changes = np.zeros((len(guard_nums), 61), np.int64)
+            changes[np.searchsorted(guard_nums, self.guard_nums)] = self.changes
+            self.guard_nums, self.changes = guard_nums, changes
+        return np.searchsorted(self.guard_nums, guards)
+
+    def update(self, key, minute, event, guard):
+        """Merge in newly appended events, as returned by parse"""
+        if not len(key):
+            return
+        if key.min() < self.last_key:
+            raise ValueError("New events can't be earlier than the ones already merged")
+        if self.current:
+            # carry on with the shift that was going on
+            key = np.concatenate(([self.last_key - 1], key))
+            minute = np.concatenate(([0], minute))
+            event = np.concatenate(([BEGINS], event)).astype(np.uint8)
+            guard = np.concatenate(([self.current], guard))
+        guards, shift, minute, change = naps(key, minute, event, guard)
+        which = self._rows(guards)
+        self.changes += (
+            np.bincount(which[shift] * 61 + minute, change, minlength=self.changes.size)
+            .reshape(self.changes.shape)
+            .astype(np.int64)
+        )
+        if len(guards):
+            self.current = guards[-1]
+        self.last_key = key.max()
+
+    def histograms(self):
+        """The guard numbers and how often each of them was asleep in each minute"""
+        return self.guard_nums, np.cumsum(self.changes[:, :60], 1)
+
+    def save(self, filename):
+        np.savez(
+            filename,
+            guard_nums=self.guard_nums,
+            changes=self.changes,
+            state=np.array((self.current, self.last_key), np.int64),
+        )
+
+    @classmethod
+    def load(cls, filename):
+        stats = cls()
+        with np.load(filename) as npz:
+            stats.guard_nums = npz["guard_nums"]
+            stats.changes = npz["changes"]
+            stats.current, stats.last_key = npz["state"].tolist()
+        return stats
+
+
+def strategy_1(guard_nums, hist):
+    """The sleepiest guard times their sleepiest minute"""
+    guard = hist.sum(1).argmax()
+    return guard_nums[guard] * hist[guard].argmax()
+
+
+def strategy_2(guard_nums, hist):
+    """The guard most often asleep in the same minute times that minute"""
+    guard = hist.max(1).argmax()
+    return guard_nums[guard] * hist[guard].argmax()
 
-    total_sleep = df2.groupby("guard_num").sleep_time.sum()
-    sleepiest_guard_num = total_sleep.idxmax()
-    sleepiest_guard = df2[df2.guard_num == sleepiest_guard_num]
-
-    sleepiest_minute = np.array([~d for d in sleepiest_guard.awake]).sum(0).argmax()
-
-    print("Answer 1:", sleepiest_minute * sleepiest_guard_num)
 
-    minute_of_most_sleep = df2.groupby("guard_num").awake.agg(
-        lambda x: (~np.stack(x)).sum(0).argmax()
-    )
-    minutes_of_sleep = df2.groupby("guard_num").awake.agg(lambda x: (~np.stack(x)).sum(0).max())
-
-    guard_num = minutes_of_sleep.idxmax()
-    minute = minute_of_most_sleep[guard_num]
-    print("Answer 2:", guard_num * minute)
+if __name__ == "__main__":
+    stats = GuardStats()
+    stats.update(*cache.load("input.txt", parse, "day4", 1))
+    print("Answer 1:", strategy_1(*stats.histograms()))
+    print("Answer 2:", strategy_2(*stats.histograms()))
@@ -8,65 +8,68 @@ https://adventofcode.com/2018/day/5
 Copyright David Hoffman, 2018
 """
 
-import string
+import os
+from concurrent.futures import ProcessPoolExecutor
 
 
-def will_react(monomerA, monomerB):
-    return monomerA.lower() == monomerB.lower() and monomerA != monomerB
+def react(polymer):
+    """React polymer (bytes) to completion in a single pass
+
+    The stack holds the units that have nothing left to react with so far,
+    each new unit either cancels the top of the stack or goes on it. Two
+    units react when they are the same letter in different cases, i.e. they
+    differ only in the case bit.
+    """
+    stack = bytearray()
+    pop, push = stack.pop, stack.append
+    for unit in polymer:
+        if stack and stack[-1] ^ unit == 32:
+            pop()
+        else:
+            push(unit)
+    return bytes(stack)
 
 
-def react(polymer):
-    """React polymer, 1 time"""
-    old, new, remaining = polymer[0], polymer[1], polymer[2:]
-    reacted = ""
-    while len(remaining):
-        # compare
-        if will_react(old, new):
-            # they react!
-            try:
-                old, new, remaining = remaining[0], remaining[1], remaining[2:]
-            except IndexError:
-                # this takes care of odd numbers
-                return reacted + remaining
+def _length_without(polymer, unit):
+    """The length of polymer reacted after removing unit in both cases"""
+    return len(react(polymer.replace(bytes([unit]), b"").replace(bytes([unit ^ 32]), b"")))
 
-        else:
-            # they don't react
-            reacted += old
-            old = new
-            new = remaining[0]
-            remaining = remaining[1:]
 
-    # react final pair if necessary
-    if will_react(old, new):
-        return reacted
-    return reacted + old + new
+def removal_lengths(polymer, jobs=None, units=None):
+    """The reacted length after removing each unit type, as a dict keyed by lowercase letter
 
+    Removing a unit type and reacting can be done in either order, so the
+    already reacted polymer is a much shorter place to start. The unit types
+    are spread over a pool of jobs processes (all cores by default, jobs=1
+    runs them here).
 
-def react_all(string):
-    """React to completion"""
-    reacted = react(string)
-    while reacted != string:
-        # keep on reacting until no changes
-        string = reacted
-        reacted = react(string)
-    return reacted
+    units (bytes) are the unit types to report, by default the ones in
+    polymer. Pass the ones in the original polymer when starting from the
+    reacted one, any that reacted away completely leave it as it is.
+    """
+    present = set(polymer.lower())
+    units = sorted(present if units is None else set(units.lower()))
+    missing = [unit for unit in units if unit not in present]
+    units = [unit for unit in units if unit in present]
+    if jobs == 1:
+        lengths = [_length_without(polymer, unit) for unit in units]
+    else:
+        with ProcessPoolExecutor(max_workers=jobs or os.cpu_count()) as executor:
+            lengths = list(executor.map(_length_without, [polymer] * len(units), units))
+    lengths = dict(zip(units, lengths))
+    lengths.update(dict.fromkeys(missing, len(polymer)))
+    return {chr(unit): lengths[unit] for unit in sorted(lengths)}
 
 
 def data():
-    """get long string"""
-    with open("input.txt", "r") as fp:
-        return fp.read().strip("\n")
+    """get long string, as bytes"""
+    with open("input.txt", "rb") as fp:
+        return fp.read().strip()
 
 
 if __name__ == "__main__":
     input_ = data()
-    reacted = react_all(input_)
+    reacted = react(input_)
     print("Answer 1:", len(reacted))
 
-    results = []
-    for letter in string.ascii_lowercase:
-        new_input = input_.replace(letter, "").replace(letter.upper(), "")
-        # print(len(new_input))
-        results.append(len(react_all(new_input)))
-
-    print("Answer 2:", min(results))
+    print("Answer 2:", min(removal_lengths(reacted, units=input_).values()))
@@ -8,37 +8,116 @@ https://adventofcode.com/2018/day/6
 Copyright David Hoffman, 2018
 """
 
+import os
+import sys
 import numpy as np
-import pandas as pd
 
-# read in data
-data = pd.read_csv("input.txt", header=None).values
+# shared code lives in the aoc package at the root of the repository
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from aoc.lazy import read_ints  # noqa: E402
 
-# calculate max values and make indices
-idx = np.indices(data.max(0) + 1)
 
-# calculate distances for all points
-distances = abs((idx[None] - data[..., None, None])).sum(1)
+def _distances(rows, cols, points):
+    """Manhattan distances from each of points to every cell of rows x cols, (points, rows, cols)"""
+    return abs(rows[None, :, None] - points[:, 0, None, None]) + abs(
+        cols[None, None, :] - points[:, 1, None, None]
+    )
 
-# Mark pixels by index of closest coordinate
-mapped = distances.argmin(0)
 
-# any that are equidistant are invalid
-mapped[(distances == distances.min(0)).sum(0) > 1] = -1
+def closest_areas(points, shape=None, block_rows=64, batch=8):
+    """The number of cells closest to each point and whether that area is infinite
 
-# calc areas
-areas = np.array([(mapped == i).sum() for i in range(len(data))])
+    The grid (by default just big enough to hold the points) is done a block
+    of rows at a time and the points a batch at a time, keeping only the
+    running minimum distance, closest point and whether there's a tie for
+    each cell of the block. Areas that reach the edge of the grid go on
+    forever. Memory is O(batch x block_rows x columns) however many points
+    there are.
+    """
+    if shape is None:
+        shape = points.max(0) + 1
+    nrows, ncols = shape
+    cols = np.arange(ncols)
+    areas = np.zeros(len(points), np.int64)
+    infinite = np.zeros(len(points), bool)
+    for top in range(0, nrows, block_rows):
+        rows = np.arange(top, min(top + block_rows, nrows))
+        best = np.full((len(rows), ncols), np.iinfo(np.int64).max)
+        closest = np.zeros(best.shape, np.intp)
+        tie = np.zeros(best.shape, bool)
+        for start in range(0, len(points), batch):
+            distances = _distances(rows, cols, points[start : start + batch])
+            nearest = distances.min(0)
+            closer = nearest < best
+            # ties within the batch, or with the best so far
+            tie = np.where(closer, (distances == nearest).sum(0) > 1, tie | (nearest == best))
+            closest = np.where(closer, distances.argmin(0) + start, closest)
+            best = np.minimum(best, nearest)
 
-# edges need to be ignored
-edges = np.unique(np.concatenate((mapped[[0, -1]].ravel(), mapped[:, [0, -1]].ravel())))
-edges = edges[edges > -1]
+        areas += np.bincount(closest[~tie], minlength=len(points))
+        # the first and last column, and the first and last row when they're in this block
+        edge = np.zeros(best.shape, bool)
+        edge[:, [0, -1]] = True
+        edge[rows == 0] = True
+        edge[rows == nrows - 1] = True
+        infinite[closest[edge & ~tie]] = True
+    return areas, infinite
 
-# filter out areas that correspond to edges
-filt = np.ones(len(areas), dtype=bool)
-filt[edges] = False
-areas_filtered = areas[filt]
+
+def axis_distances(coords, positions):
+    """The total distance along one axis from every one of coords to each of positions
+
+    With the coords sorted and their prefix sums, the coords below a
+    position add up to count * position - their sum and likewise above.
+    """
+    coords = np.sort(coords)
+    prefix = np.concatenate(([0], np.cumsum(coords)))
+    below = np.searchsorted(coords, positions, "right")
+    above = len(coords) - below
+    return (below * positions - prefix[below]) + ((prefix[-1] - prefix[below]) - above * positions)
+
+
+def safe_cells(points, limit=10000, bounds=None):
+    """The number of cells whose total distance to all points is less than limit
+
+    Manhattan distance separates, so the total for a cell is the total for
+    its row plus the total for its column. Those are worked out for each
+    row and column. A total distance is convex along its axis, so the
+    columns under any limit are one run around the smallest column total,
+    which is found by a binary search on each side of it for every row.
+    Nothing but the points gets sorted, O(N log N + H log W) rather than
+    O(N x H x W).
+
+    bounds ((first row, last row), (first column, last column)), inclusive,
+    limits the grid, by default it's every cell that could be under the
+    limit, which reaches limit / N past the points on all sides.
+    """
+    n = len(points)
+    totals = []
+    for axis in range(2):
+        coords = points[:, axis]
+        if bounds is None:
+            reach = limit // max(n, 1) + 1
+            first, last = coords.min() - reach, coords.max() + reach
+        else:
+            first, last = bounds[axis]
+        totals.append(axis_distances(coords, np.arange(first, last + 1)))
+    row_totals, col_totals = totals
+    if not len(row_totals) or not len(col_totals):
+        return 0
+    # read outwards from the lowest column total both sides only go up
+    lowest = col_totals.argmin()
+    left, right = col_totals[lowest::-1], col_totals[lowest:]
+    # for each row, the columns on either side that keep the total under the limit
+    room = limit - row_totals
+    count = np.searchsorted(left, room, "left") + np.searchsorted(right, room, "left")
+    # the lowest column is on both sides
+    return int((count - (col_totals[lowest] < room)).sum())
 
 
 if __name__ == "__main__":
-    print("Answer 1:", areas_filtered.max())
-    print("Answer 2:", (distances.sum(0) < 10000).sum())
+    # read in data
+    data = read_ints("input.txt", ndmin=2)
+    areas, infinite = closest_areas(data)
+    print("Answer 1:", areas[~infinite].max(initial=0))
+    print("Answer 2:", safe_cells(data))
@@ -10,10 +10,9 @@ Copyright David Hoffman, 2018
 Bits copied from reddit.com/r/adventofcode
 """
 
+import heapq
 import string
-import networkx as nx
 import numpy as np
-import matplotlib.pyplot as plt
 
 """
 This seems to be a simple sorting algorithm. Start with alphabet in order
@@ -29,37 +28,302 @@ Step D must be finished before step E can begin.
 Step F must be finished before step E can begin."""
 
 
-def parse(line):
-    return line[5], line[36]
+class CycleError(ValueError):
+    """The steps can't all be done because some of them wait on each other"""
+
+
+def _names(buf, starts, ends):
+    """The byte strings buf[starts:ends] as one fixed width array, padded with zeros"""
+    width = max((ends - starts).max(initial=1), 1)
+    columns = starts[:, None] + np.arange(width)
+    chars = np.where(columns < ends[:, None], buf[np.minimum(columns, len(buf) - 1)], 0)
+    return chars.astype(np.uint8).view("S{}".format(width)).ravel()
+
+
+def parse(text):
+    """The names of the steps that must be finished first and of the steps that wait for them
+
+    Every line reads "Step A must be finished before step B can begin.", so
+    the names are found from the positions of the spaces in the whole text
+    at once and come back as arrays of byte strings.
+    """
+    buf = np.frombuffer(text.encode() + b"\n", np.uint8)
+    ends = np.flatnonzero(buf == ord("\n"))
+    starts = np.concatenate(([0], ends[:-1] + 1))
+    # skip blank lines
+    starts = starts[ends > starts]
+    spaces = np.flatnonzero(buf == ord(" "))
+    first = starts + len("Step ")
+    first_end = spaces[np.searchsorted(spaces, first)]
+    second = first_end + len(" must be finished before step ")
+    second_end = spaces[np.searchsorted(spaces, second)]
+    return _names(buf, first, first_end), _names(buf, second, second_end)
+
+
+def _unique(names):
+    """np.unique(names, return_inverse=True) for byte strings
+
+    Names of up to 8 bytes are sorted as big endian integers, which is the
+    same order and much quicker than comparing strings.
+    """
+    if names.dtype.itemsize > 8:
+        return np.unique(names, return_inverse=True)
+    chars = np.zeros((len(names), 8), np.uint8)
+    chars[:, : names.dtype.itemsize] = names.view(np.uint8).reshape(
+        len(names), names.dtype.itemsize
+    )
+    keys, inverse = np.unique(chars.view(">u8").ravel(), return_inverse=True)
+    return keys.astype(">u8").view("S8"), inverse
+
+
+def step_graph(before, after):
+    """Number the steps in alphabetical order and store what waits on what as CSR arrays
+
+    Returns the names, the steps waiting on step i as
+    indices[indptr[i] : indptr[i + 1]] and the number of steps each one
+    waits for.
+    """
+    names, ids = _unique(np.concatenate((before, after)))
+    src, dst = ids.reshape(2, -1)
+    n = len(names)
+    indices = dst[np.argsort(src, kind="stable")]
+    indptr = np.concatenate(([0], np.cumsum(np.bincount(src, minlength=n))))
+    return (
+        [name.decode() for name in names.tolist()],
+        indptr,
+        indices,
+        np.bincount(dst, minlength=n),
+    )
+
+
+def find_cycle(names, indptr, indices, done):
+    """Raise a CycleError naming one cycle among the steps that aren't done"""
+    src = np.repeat(np.arange(len(names)), np.diff(indptr))
+    # every step left waits on at least one other step left, follow those back
+    left = ~done
+    waits = left[src] & left[indices]
+    parent = np.full(len(names), -1)
+    parent[indices[waits]] = src[waits]
+    step = np.flatnonzero(left)[0]
+    seen = []
+    while step not in seen:
+        seen.append(step)
+        step = parent[step]
+    cycle = seen[seen.index(step) :][::-1]
+    raise CycleError(" -> ".join(names[i] for i in cycle + cycle[:1]))
+
+
+def topological_order(names, indptr, indices, in_degree):
+    """The order to do the steps in, the first available step alphabetically goes first
+
+    Kahn's algorithm with a heap of the steps that are ready.
+    """
+    in_degree = in_degree.tolist()
+    indptr, children = indptr.tolist(), indices.tolist()
+    ready = [step for step, degree in enumerate(in_degree) if not degree]
+    heapq.heapify(ready)
+    order = []
+    while ready:
+        step = heapq.heappop(ready)
+        order.append(step)
+        for child in children[indptr[step] : indptr[step + 1]]:
+            in_degree[child] -= 1
+            if not in_degree[child]:
+                heapq.heappush(ready, child)
+    if len(order) < len(names):
+        done = np.zeros(len(names), bool)
+        done[order] = True
+        find_cycle(names, np.array(indptr), indices, done)
+    return order
+
+
+def step_durations(names, base=60):
+    """How long each step takes, base plus its place in the alphabet (A=1, B=2, ...)
+
+    When the names aren't all single letters they're numbered in
+    alphabetical order instead.
+    """
+    if all(len(name) == 1 and name in string.ascii_uppercase for name in names):
+        return [base + ord(name) - ord("A") + 1 for name in names]
+    return [base + i + 1 for i in range(len(names))]
+
+
+def _simulate(bounds, children, in_degree, workers, durations, state=None, fork=None):
+    """Run the workers over the graph held as lists
+
+    Returns (step, end, worker) for each step in order of ending and, if
+    some steps couldn't be done, a mask of the steps that were.
+
+    Free workers always take the available step that comes first
+    alphabetically, the free worker with the lowest number takes it.
+    Available steps, free workers and the steps being worked on are kept in
+    heaps and the clock jumps from one step finishing to the next, so this
+    is O((V + E) log V).
+
+    Up to the first time more than n steps would be in progress at once a
+    run goes exactly as it would with n workers. fork(n, state) is called at
+    each of those points with the state of the run, and passing a copy of
+    it back in with workers=n carries on from there instead of starting
+    over.
+    """
+    if state is None:
+        in_degree = list(in_degree)
+        # step numbers are in alphabetical order
+        ready = [step for step, degree in enumerate(in_degree) if not degree]
+        heapq.heapify(ready)
+        # (time finished, step, worker)
+        running = []
+        done = []
+        time = 0
+    else:
+        time, in_degree, ready, running, done = state
+    # the lowest numbered workers are always taken first, so the busy ones are all below n
+    busy = {worker for _, _, worker in running}
+    free = [worker for worker in range(workers) if worker not in busy]
+    most = max(len(running), 1)
+    while ready or running:
+        while ready and free:
+            if fork is not None and len(running) == most:
+                fork(most, (time, in_degree, ready, running, done))
+                most += 1
+            step = heapq.heappop(ready)
+            heapq.heappush(running, (time + durations[step], step, heapq.heappop(free)))
+        time = running[0][0]
+        # everything finishing now frees up its steps before anyone picks the next one
+        while running and running[0][0] == time:
+            _, step, worker = heapq.heappop(running)
+            heapq.heappush(free, worker)
+            done.append((step, time, worker))
+            for child in children[bounds[step] : bounds[step + 1]]:
+                in_degree[child] -= 1
+                if not in_degree[child]:
+                    heapq.heappush(ready, child)
+    if len(done) < len(in_degree):
+        finished = np.zeros(len(in_degree), bool)
+        finished[[step for step, _, _ in done]] = True
+        return done, finished
+    return done, None
+
+
+def _run(names, indptr, indices, in_degree, workers, base, durations):
+    """_simulate for a step graph, raising CycleError if it can't be finished"""
+    if durations is None:
+        durations = step_durations(names, base)
+    if workers is None:
+        workers = len(names)
+    bounds, children = indptr.tolist(), indices.tolist()
+    done, finished = _simulate(bounds, children, in_degree.tolist(), workers, durations)
+    if finished is not None:
+        find_cycle(names, indptr, indices, finished)
+    return done, durations
+
+
+def timeline(names, indptr, indices, in_degree, workers=5, base=60, durations=None):
+    """When and by which worker each step is done, as a structured array in order of starting
+
+    workers=None means as many as could ever be used.
+    """
+    done, durations = _run(names, indptr, indices, in_degree, workers, base, durations)
+    width = max((len(name) for name in names), default=1)
+    steps = np.zeros(
+        len(done),
+        [
+            ("step", np.int64),
+            ("name", "U{}".format(width)),
+            ("start", np.int64),
+            ("end", np.int64),
+            ("worker", np.int64),
+        ],
+    )
+    if done:
+        steps["step"], steps["end"], steps["worker"] = zip(*done)
+        steps["start"] = steps["end"] - np.asarray(durations)[steps["step"]]
+        steps["name"] = np.array(names)[steps["step"]]
+    return steps[np.lexsort((steps["worker"], steps["start"]))]
+
+
+def schedule(names, indptr, indices, in_degree, workers=5, base=60, durations=None):
+    """The time it takes workers to do all the steps"""
+    done, _ = _run(names, indptr, indices, in_degree, workers, base, durations)
+    # steps are done in order of ending
+    return done[-1][1] if done else 0
+
+
+def utilization(steps, workers):
+    """The fraction of the total time each worker spends busy, from a timeline"""
+    busy = np.bincount(steps["worker"], steps["end"] - steps["start"], minlength=workers)
+    return busy / max(steps["end"].max(initial=0), 1)
+
+
+def critical_path(names, indptr, indices, in_degree, base=60, durations=None):
+    """The longest chain of steps that wait on each other and how long it takes
+
+    No number of workers can do everything quicker than this.
+    """
+    if durations is None:
+        durations = step_durations(names, base)
+    if not len(names):
+        return [], 0
+    # earliest start of each step and the step that holds it up
+    earliest = [0] * len(names)
+    held_up_by = [-1] * len(names)
+    bounds, children = indptr.tolist(), indices.tolist()
+    for step in topological_order(names, indptr, indices, in_degree):
+        end = earliest[step] + durations[step]
+        for child in children[bounds[step] : bounds[step + 1]]:
+            if end > earliest[child]:
+                earliest[child] = end
+                held_up_by[child] = step
+    ends = np.add(earliest, durations)
+    step = int(ends.argmax())
+    path = []
+    while step >= 0:
+        path.append(names[step])
+        step = held_up_by[step]
+    return path[::-1], int(ends.max())
+
+
+def sweep_workers(names, indptr, indices, in_degree, max_workers, base=60, durations=None):
+    """Total time and mean utilization for every number of workers from 1 to max_workers
+
+    Only one run is done from the start, with no limit on workers. Each
+    smaller number of workers goes the same way until it first runs out of
+    workers, so its run forks off the unlimited one there and only the rest
+    of it is simulated. Numbers of workers that are never all busy at once
+    take as long as the unlimited run.
+    """
+    if durations is None:
+        durations = step_durations(names, base)
+    sweep = np.zeros(
+        max_workers, [("workers", np.int64), ("time", np.int64), ("utilization", float)]
+    )
+    sweep["workers"] = np.arange(1, max_workers + 1)
+    bounds, children = indptr.tolist(), indices.tolist()
+
+    def fork(workers, state):
+        if workers <= max_workers:
+            state = [state[0]] + [list(part) for part in state[1:]]
+            done, _ = _simulate(bounds, children, None, workers, durations, state)
+            sweep["time"][workers - 1] = done[-1][1]
+
+    sweep["time"] = -1
+    done, finished = _simulate(
+        bounds, children, in_degree.tolist(), len(names), durations, fork=fork
+    )
+    if finished is not None:
+        find_cycle(names, indptr, indices, finished)
+    sweep["time"][sweep["time"] < 0] = done[-1][1] if done else 0
+    sweep["utilization"] = np.sum(durations) / np.maximum(sweep["time"] * sweep["workers"], 1)
+    return sweep
 
 
 if __name__ == "__main__":
+    example = step_graph(*parse(data))
+    assert "".join(example[0][i] for i in topological_order(*example)) == "CABDFE"
+    assert schedule(*example, workers=2, base=0) == 15
+
     with open("input.txt", "r") as fp:
-        data = "".join(fp.readlines())
-
-    data = data.strip("\n").split("\n")
-
-    graph = nx.DiGraph()
-    graph.add_edges_from([parse(line) for line in data])
-
-    ans = "".join(nx.lexicographical_topological_sort(graph))
-    print("Answer 1:", ans)
-
-    task_times = []
-    tasks = []
-    time = 0
-    while task_times or graph:
-        available_tasks = [t for t in graph if t not in tasks and graph.in_degree(t) == 0]
-        if available_tasks and len(task_times) < 5:
-            task = min(available_tasks)  # min gets smallest task alphabetically
-            task_times.append(ord(task) - 4)
-            tasks.append(task)
-        else:
-            min_time = min(task_times)
-            completed = [tasks[i] for i, v in enumerate(task_times) if v == min_time]
-            task_times = [v - min_time for v in task_times if v > min_time]
-            tasks = [t for t in tasks if t not in completed]
-            time += min_time
-            graph.remove_nodes_from(completed)
-
-    print("Answer 2:", time)
+        graph = step_graph(*parse(fp.read()))
+
+    print("Answer 1:", "".join(graph[0][i] for i in topological_order(*graph)))
+    print("Answer 2:", schedule(*graph))
@@ -8,90 +8,107 @@ https://adventofcode.com/2018/day/8
 Copyright David Hoffman, 2018
 """
 
-from collections import deque
 import numpy as np
-import networkx as nx
 
 
 def parse(input_):
-    """Parse input data"""
-    return deque(int(i) for i in input_.split())
-
-
-class inc(object):
-    """We can use a normal int in a recursive function so make a simple class"""
-
-    def __init__(self, i):
-        self.i = i
-
-    def __call__(self, i=1):
-        self.i += i
-
-
-def build_graph(data):
-    """build graph from data"""
-    # initialize graph
-    graph = nx.DiGraph()
-    # and incrementor
-    node_num = inc(0)
-
-    def build(parent):
-        """The recursive function to build the graph"""
-        # pull current node number
-        node = node_num.i
-        # increase node number for next round
-        node_num()
-
-        # read header
-        # number of children nodes
-        num_children = data.popleft()
-        # amount of meta data
-        num_meta = data.popleft()
-
-        # iterate through children
-        for i in range(num_children):
-            build(node)
-        # after dealing with children if there are any, add the edge and read metadata
-        if node:
-            graph.add_edge(parent, node)
-        graph.nodes[node]["meta"] = tuple(data.popleft() for i in range(num_meta))
-
-    build(node_num.i)
-
-    return graph
-
-
-def get_value(graph):
-    """Get value for the graph (problem 2)"""
-
-    def value(node):
-        """recursive function to get value for current node"""
-        successors = list(graph.successors(node))
-        meta = graph.nodes[node]["meta"]
-        if not len(successors):
-            return np.sum(meta)
-        r = []
-        for idx in meta:
-            try:
-                # need -1 because list are zero indexed but not the problem
-                r.append(value(successors[idx - 1]))
-            except IndexError:
-                pass
-        return np.sum(r, dtype="int")
-
-    # calculate value from root.
-    return value(0)
+    """Parse input data into an int32 array of tokens"""
+    return np.array(input_.split(), np.int32)
+
+
+def _spans(starts, counts):
+    """The indices starts[i] .. starts[i] + counts[i] - 1 for every i, as one flat array"""
+    offsets = np.cumsum(counts) - counts
+    return np.repeat(starts - offsets, counts) + np.arange(counts.sum())
+
+
+def build_tree(tokens):
+    """Read the license tree out of tokens with an explicit stack instead of recursion
+
+    Nodes are numbered in the order their headers appear, the root is 0.
+    Returns flat arrays:
+
+    - parent of each node (-1 for the root) and its depth
+    - children of node i in order, children[child_ptr[i] : child_ptr[i + 1]]
+    - metadata of node i, meta[meta_ptr[i] : meta_ptr[i + 1]]
+    """
+    # every node takes at least its two header tokens
+    max_nodes = len(tokens) // 2
+    parent = np.empty(max_nodes, np.int32)
+    depth = np.empty(max_nodes, np.int32)
+    meta_start = np.empty(max_nodes, np.int64)
+    meta_count = np.empty(max_nodes, np.int64)
+    # plain ints are much quicker to read one at a time than numpy scalars
+    headers = tokens.tolist() if len(tokens) else [0]
+
+    # [node, children left to read, number of metadata]
+    stack = [[-1, 1, 0]]
+    pos = 0
+    node = 0
+    while stack:
+        top = stack[-1]
+        if top[1]:
+            top[1] -= 1
+            if pos + 2 > len(tokens):
+                raise ValueError("License file ends in the middle of a header")
+            parent[node] = top[0]
+            depth[node] = len(stack) - 1
+            stack.append([node, headers[pos], headers[pos + 1]])
+            pos += 2
+            node += 1
+        else:
+            stack.pop()
+            if top[0] >= 0:
+                meta_start[top[0]] = pos
+                meta_count[top[0]] = top[2]
+                pos += top[2]
+    if pos > len(tokens):
+        raise ValueError("License file ends in the middle of the metadata")
+    if pos < len(tokens):
+        raise ValueError("License file goes on after the root's metadata")
+
+    parent, depth = parent[:node], depth[:node]
+    meta_start, meta_count = meta_start[:node], meta_count[:node]
+    # parents come before their children, so a stable sort keeps the children in order
+    children = np.argsort(parent[1:], kind="stable").astype(np.int32) + 1
+    child_ptr = np.concatenate(([0], np.cumsum(np.bincount(parent[1:], minlength=node))))
+    meta_ptr = np.concatenate(([0], np.cumsum(meta_count)))
+    meta = tokens[_spans(meta_start, meta_count)]
+    return parent, depth, child_ptr, children, meta_ptr, meta
+
+
+def get_value(tree):
+    """Get value for the tree (problem 2)
+
+    Children are always deeper than their parents, so the values are worked
+    out a level at a time from the deepest up.
+    """
+    parent, depth, child_ptr, children, meta_ptr, meta = tree
+    num_children = np.diff(child_ptr)
+    # the node each metadata entry belongs to
+    owner = np.repeat(np.arange(len(parent)), np.diff(meta_ptr))
+    value = np.zeros(len(parent), np.int64)
+    # leaves are worth their metadata
+    leaf_meta = num_children[owner] == 0
+    value += np.bincount(owner[leaf_meta], meta[leaf_meta], minlength=len(parent)).astype(np.int64)
+    # other metadata refer to the children, counting from 1, if they exist
+    ref = ~leaf_meta & (meta >= 1) & (meta <= num_children[owner])
+    ref_owner = owner[ref]
+    ref_child = children[child_ptr[ref_owner] + meta[ref] - 1]
+    ref_depth = depth[ref_owner]
+    order = np.argsort(-ref_depth, kind="stable")
+    ref_owner, ref_child, ref_depth = ref_owner[order], ref_child[order], ref_depth[order]
+    levels = np.flatnonzero(np.diff(ref_depth, prepend=-1, append=-1))
+    for start, stop in zip(levels[:-1], levels[1:]):
+        np.add.at(value, ref_owner[start:stop], value[ref_child[start:stop]])
+    return value[0] if len(value) else 0
 
 
 if __name__ == "__main__":
     # read real data from file
     with open("input.txt", "r") as fp:
-        data = parse(fp.read())
-
-    graph = build_graph(data)
+        tree = build_tree(parse(fp.read()))
 
-    assert not len(data), "Not all data consumed"
-    all_meta = np.concatenate([meta["meta"] for node, meta in graph.nodes.data()])
-    print("Answer 1:", all_meta.sum())
+    print("Answer 1:", tree[-1].sum())
 
-    print("Answer 2:", get_value(graph))
+    print("Answer 2:", get_value(tree))
@@ -8,8 +8,13 @@ https://adventofcode.com/2018/day/9
 Copyright David Hoffman, 2018
 """
 
+import os
+import sys
 from itertools import cycle
-import tqdm
+
+# shared code lives in the aoc package at the root of the repository
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from aoc.lazy import progress  # noqa: E402
 
 test_input = """
 9 players; last marble is worth 25 points: high score is 32
@@ -61,7 +66,7 @@ def calc_score(num_players, num_marbles):
     score = dict.fromkeys(range(num_players), 0)
     c = circle()
     # print("[-] ", c)
-    for player, marble in zip(cycle(sorted(score)), tqdm.trange(1, num_marbles)):
+    for player, marble in zip(cycle(sorted(score)), progress(range(1, num_marbles))):
         j = c.add_marble(marble)
         score[player] += j
 
@@ -8,11 +8,19 @@ https://adventofcode.com/2018/day/10
 Copyright David Hoffman, 2018
 """
 
+import os
+import sys
 import numpy as np
-import matplotlib.pyplot as plt
 from itertools import count
 import re
 
+# shared code lives in the aoc package at the root of the repository
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from aoc import cache  # noqa: E402
+from aoc.lazy import lazy_import  # noqa: E402
+
+plt = lazy_import("matplotlib.pyplot")
+
 test_data = """position=< 9,  1> velocity=< 0,  2>
 position=< 7,  0> velocity=<-1,  0>
 position=< 3, -2> velocity=<-1,  1>
@@ -46,21 +54,32 @@ position=<14,  7> velocity=<-2,  0>
 position=<-3,  6> velocity=< 2, -1>"""
 
 
+def parse(input_):
+    """Parse positions and velocities into an array of shape (n, 2, 2)"""
+    # read in all data as a flat array
+    pos_vel = np.array(list(map(int, re.findall(r"-?\d+", input_))))
+    # reshape into points, position/velocity, x/y
+    return pos_vel.reshape(-1, 2, 2)
+
+
 def bounding_box(arr):
     """return area of bounding box of point cloud"""
     return np.prod(arr.max(0) - arr.min(0))
 
 
-if __name__ == "__main__":
-    data = test_data
+def render(pos):
+    """The points as lines of text, # for a point and . for none"""
+    pos = pos - pos.min(0)
+    grid = np.full(pos.max(0) + 1, ".")
+    grid[pos[:, 0], pos[:, 1]] = "#"
+    return "\n".join("".join(row) for row in grid)
 
-    with open("input.txt", "r") as fp:
-        data = fp.read()
 
-    # read in all data as a flat array
-    pos_vel = np.array(list(map(int, re.findall(r"-?\d+", data))))
-    # reshape and extract positions and velocities
-    pos_vel = pos_vel.reshape(-1, 2, 2)
+if __name__ == "__main__":
+    pos_vel = parse(test_data)
+
+    pos_vel = cache.load("input.txt", parse, "day10")
+    # extract positions and velocities
     pos = pos_vel[:, 0, ::-1]
     vel = pos_vel[:, 1, ::-1]
 
@@ -84,10 +103,11 @@ if __name__ == "__main__":
     # best time is one previous
     best_t = t - 1
 
-    print("best time:", best_t, "(s)")
-
     # show the message
     new_pos = pos + best_t * vel
+    print("Answer 1:\n" + render(new_pos))
+    print("Answer 2:", best_t)
+
     # message is flipped vertically
     plt.scatter(new_pos[:, 1], -new_pos[:, 0])
     plt.gca().set_aspect(1)
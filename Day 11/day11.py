@@ -8,10 +8,17 @@ https://adventofcode.com/2018/day/11
 Copyright David Hoffman, 2018
 """
 
+import os
+import sys
 import numpy as np
-import scipy.ndimage as ndi
 import re
 
+# shared code lives in the aoc package at the root of the repository
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from aoc.lazy import lazy_import  # noqa: E402
+
+ndi = lazy_import("scipy.ndimage")
+
 
 def power_levels(serial_num):
     """Calculate the power levels of the fuel cells"""
@@ -9,8 +9,6 @@ Copyright David Hoffman, 2018
 """
 
 import numpy as np
-import matplotlib.pyplot as plt
-import tqdm
 
 test_input = """initial state: #..#.#..##......###...###
 
@@ -8,8 +8,6 @@ https://adventofcode.com/2018/day/14
 Copyright David Hoffman, 2018
 """
 
-import tqdm
-
 
 def simulator():
     elf0 = 3
@@ -8,12 +8,18 @@ https://adventofcode.com/2018/day/15
 Copyright David Hoffman, 2018
 """
 
+import os
+import sys
 import time
 import string
 import numpy as np
 from collections import deque
 from itertools import count
 
+# shared code lives in the aoc package at the root of the repository
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from aoc import counters  # noqa: E402
+
 translation_table = str.maketrans("#GE", "🧱👹🧝")
 
 # move in reading order
@@ -60,6 +66,7 @@ class Goblin(Unit):
     char = "G"
 
 
+@counters.timed("day15.paths_to_enemy")
 def paths_to_enemy(unit, units):
     """Breadth first search of paths"""
     enemy = "GE".replace(unit.char, "")
@@ -70,6 +77,8 @@ def paths_to_enemy(unit, units):
     queue.append((tuple(unit.position), [tuple(unit.position)]))
     while queue:
         (vertex, path) = queue.popleft()
+        if counters.ENABLED:
+            counters.incr("day15.bfs_expansions")
         for next_pos in vertex + directions:
             next_pos = tuple(next_pos)
             next_char = new_map[next_pos[0], next_pos[1]]
@@ -147,6 +156,7 @@ def enemies_left(units):
     return len(set(unit.char for unit in units)) > 1
 
 
+@counters.timed("day15.run_combat")
 def run_combat(units):
     over = False
     rounds = 0
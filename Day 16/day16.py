@@ -8,153 +8,15 @@ https://adventofcode.com/2018/day/16
 Copyright David Hoffman, 2018
 """
 
-import re
+import os
+import sys
 
-re_digits = re.compile(r"\d+")
+# shared code lives in the aoc package at the root of the repository
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from aoc import elfcode  # noqa: E402
+from aoc.elfcode import strip_digits  # noqa: E402
 
-
-def strip_digits(input_):
-    """Strip numbers from a string"""
-    return list(map(int, re_digits.findall(input_)))
-
-
-# Addition:
-
-
-def addr(register, A, B, C):
-    """(add register) stores into register C the result of adding register A and register B."""
-    register[C] = register[A] + register[B]
-    return register
-
-
-def addi(register, A, B, C):
-    """(add immediate) stores into register C the result of adding register A and value B."""
-    register[C] = register[A] + B
-    return register
-
-
-# Multiplication:
-
-
-def mulr(register, A, B, C):
-    """(multiply register) stores into register C the result of multiplying register A and register B."""
-    register[C] = register[A] * register[B]
-    return register
-
-
-def muli(register, A, B, C):
-    """(multiply immediate) stores into register C the result of multiplying register A and value B."""
-    register[C] = register[A] * B
-    return register
-
-
-# Bitwise AND:
-
-
-def banr(register, A, B, C):
-    """(bitwise AND register) stores into register C the result of the bitwise AND of register A and register B."""
-    register[C] = register[A] & register[B]
-    return register
-
-
-def bani(register, A, B, C):
-    """(bitwise AND immediate) stores into register C the result of the bitwise AND of register A and value B."""
-    register[C] = register[A] & B
-    return register
-
-
-# Bitwise OR:
-
-
-def borr(register, A, B, C):
-    """(bitwise OR register) stores into register C the result of the bitwise OR of register A and register B."""
-    register[C] = register[A] | register[B]
-    return register
-
-
-def bori(register, A, B, C):
-    """(bitwise OR immediate) stores into register C the result of the bitwise OR of register A and value B."""
-    register[C] = register[A] | B
-    return register
-
-
-# Assignment:
-
-
-def setr(register, A, B, C):
-    """(set register) copies the contents of register A into register C. (Input B is ignored.)"""
-    register[C] = register[A]
-    return register
-
-
-def seti(register, A, B, C):
-    """(set immediate) stores value A into register C. (Input B is ignored.)"""
-    register[C] = A
-    return register
-
-
-# Greater-than testing:
-
-
-def gtir(register, A, B, C):
-    """(greater-than immediate/register) sets register C to 1 if value A is greater than register B. Otherwise, register C is set to 0."""
-    register[C] = int(A > register[B])
-    return register
-
-
-def gtri(register, A, B, C):
-    """(greater-than register/immediate) sets register C to 1 if register A is greater than value B. Otherwise, register C is set to 0."""
-    register[C] = int(register[A] > B)
-    return register
-
-
-def gtrr(register, A, B, C):
-    """(greater-than register/register) sets register C to 1 if register A is greater than register B. Otherwise, register C is set to 0."""
-    register[C] = int(register[A] > register[B])
-    return register
-
-
-# Equality testing:
-
-
-def eqir(register, A, B, C):
-    """(equal immediate/register) sets register C to 1 if value A is equal to register B. Otherwise, register C is set to 0."""
-    register[C] = int(A == register[B])
-    return register
-
-
-def eqri(register, A, B, C):
-    """(equal register/immediate) sets register C to 1 if register A is equal to value B. Otherwise, register C is set to 0."""
-    register[C] = int(register[A] == B)
-    return register
-
-
-def eqrr(register, A, B, C):
-    """(equal register/register) sets register C to 1 if register A is equal to register B. Otherwise, register C is set to 0."""
-    register[C] = int(register[A] == register[B])
-    return register
-
-
-ALL_OPS = set(
-    (
-        addr,
-        addi,
-        mulr,
-        muli,
-        banr,
-        bani,
-        borr,
-        bori,
-        setr,
-        seti,
-        gtir,
-        gtri,
-        gtrr,
-        eqir,
-        eqri,
-        eqrr,
-    )
-)
+ALL_OPS = set(elfcode.ALL_OPS.values())
 
 assert len(ALL_OPS) == 16
 
@@ -218,19 +80,16 @@ if __name__ == "__main__":
 
     assert len(ALL_OPS) == len(test_set)
 
-    # convert the dictionary into a mapping of cuntions
-    OP_CODES = {k: v.pop() for k, v in OP_CODES.items()}
+    # convert the dictionary into a mapping of op names
+    OP_CODES = {k: v.pop().__name__ for k, v in OP_CODES.items()}
 
-    def execute(command, register):
-        """Execute the command on a register"""
-        op, A, B, C = command
-        return OP_CODES[op](register, A, B, C)
+    # decode the program into something the elfcode VM can run
+    program = elfcode.decode([[OP_CODES[op], A, B, C] for op, A, B, C in program])
 
     # start with empty register
     register = [0, 0, 0, 0]
 
     # iterate through program
-    for command in program:
-        execute(command, register)
+    elfcode.run(program, register)
 
     print("Answer 2:", register[0])
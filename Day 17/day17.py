@@ -8,8 +8,16 @@ https://adventofcode.com/2018/day/17
 Copyright David Hoffman, 2018
 """
 
+import os
+import sys
 import numpy as np
-import matplotlib.pyplot as plt
+
+# shared code lives in the aoc package at the root of the repository
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from aoc import cache, counters  # noqa: E402
+from aoc.lazy import lazy_import  # noqa: E402
+
+plt = lazy_import("matplotlib.pyplot")
 
 
 # water can't go up so no up direction
@@ -72,10 +80,18 @@ def parse(input_):
     return map_, (maxy, maxx), (miny, minx)
 
 
+def load(filename):
+    """Parse a file, skipping the parsing if the cache has seen it before"""
+    map_, maxes, mins = cache.load(filename, lambda input_: parse(input_.splitlines()), "day17")
+    map_.flags.writeable = False
+    return map_, tuple(int(i) for i in maxes), tuple(int(i) for i in mins)
+
+
 def new_vertex(old_vertex, direction):
     return tuple(i + di for i, di in zip(old_vertex, direction))
 
 
+@counters.timed("day17.fill_water")
 def fill_water(start, map_):
     """this is essentially a depth first search"""
     visited = set()
@@ -124,6 +140,8 @@ def fill_water(start, map_):
 
     while stack:
         vertex, old_dir = stack.pop()
+        if counters.ENABLED:
+            counters.incr("day17.stack_pops")
         if vertex in visited:
             # if we've been here before move along
             continue
@@ -173,8 +191,7 @@ if __name__ == "__main__":
 
     assert len(list(filter(lambda x: x[0] >= mins[0], water))) == 57
 
-    with open("input.txt", "r") as fp:
-        map_, maxes, mins = parse(fp.readlines())
+    map_, maxes, mins = load("input.txt")
 
     for i, (water, standing, current) in enumerate((fill_water((0, 500), map_))):
         pass
@@ -8,9 +8,16 @@ https://adventofcode.com/2018/day/20
 Copyright David Hoffman, 2018
 """
 
+import os
+import sys
 from collections import deque
-import networkx as nx
-import matplotlib.pyplot as plt
+
+# shared code lives in the aoc package at the root of the repository
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from aoc.lazy import lazy_import, PLOT  # noqa: E402
+
+nx = lazy_import("networkx")
+plt = lazy_import("matplotlib.pyplot")
 
 DIRECTIONS = dict(E=(0, 1), W=(0, -1), N=(-1, 0), S=(1, 0))
 
@@ -75,8 +82,9 @@ if __name__ == "__main__":
     path_lengths = nx.shortest_path_length(graph, (0, 0))
     print("Answer 2:", sum(length >= 1000 for length in path_lengths.values()))
 
-    nx.draw_spectral(graph)
-    plt.gcf().savefig("test.pdf")
+    if PLOT:
+        nx.draw_spectral(graph)
+        plt.gcf().savefig("test.pdf")
 
     # maze = nx.Graph()
 
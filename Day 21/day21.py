@@ -1,162 +1,19 @@
 #!/usr/bin/env python
 # -*- coding: utf-8 -*-
-# day19.py
+# day21.py
 """
-Advent of Code Day 19
-https://adventofcode.com/2018/day/19
+Advent of Code Day 21
+https://adventofcode.com/2018/day/21
 
 Copyright David Hoffman, 2018
 """
 
-import re
-from itertools import count
-import tqdm
+import os
+import sys
 
-re_digits = re.compile(r"\d+")
-
-
-def strip_digits(input_):
-    """Strip numbers from a string"""
-    return list(map(int, re_digits.findall(input_)))
-
-
-# Addition:
-
-
-def addr(register, A, B, C):
-    """(add register) stores into register C the result of adding register A and register B."""
-    register[C] = register[A] + register[B]
-    return register
-
-
-def addi(register, A, B, C):
-    """(add immediate) stores into register C the result of adding register A and value B."""
-    register[C] = register[A] + B
-    return register
-
-
-# Multiplication:
-
-
-def mulr(register, A, B, C):
-    """(multiply register) stores into register C the result of multiplying register A and register B."""
-    register[C] = register[A] * register[B]
-    return register
-
-
-def muli(register, A, B, C):
-    """(multiply immediate) stores into register C the result of multiplying register A and value B."""
-    register[C] = register[A] * B
-    return register
-
-
-# Bitwise AND:
-
-
-def banr(register, A, B, C):
-    """(bitwise AND register) stores into register C the result of the bitwise AND of register A and register B."""
-    register[C] = register[A] & register[B]
-    return register
-
-
-def bani(register, A, B, C):
-    """(bitwise AND immediate) stores into register C the result of the bitwise AND of register A and value B."""
-    register[C] = register[A] & B
-    return register
-
-
-# Bitwise OR:
-
-
-def borr(register, A, B, C):
-    """(bitwise OR register) stores into register C the result of the bitwise OR of register A and register B."""
-    register[C] = register[A] | register[B]
-    return register
-
-
-def bori(register, A, B, C):
-    """(bitwise OR immediate) stores into register C the result of the bitwise OR of register A and value B."""
-    register[C] = register[A] | B
-    return register
-
-
-# Assignment:
-
-
-def setr(register, A, B, C):
-    """(set register) copies the contents of register A into register C. (Input B is ignored.)"""
-    register[C] = register[A]
-    return register
-
-
-def seti(register, A, B, C):
-    """(set immediate) stores value A into register C. (Input B is ignored.)"""
-    register[C] = A
-    return register
-
-
-# Greater-than testing:
-
-
-def gtir(register, A, B, C):
-    """(greater-than immediate/register) sets register C to 1 if value A is greater than register B. Otherwise, register C is set to 0."""
-    register[C] = int(A > register[B])
-    return register
-
-
-def gtri(register, A, B, C):
-    """(greater-than register/immediate) sets register C to 1 if register A is greater than value B. Otherwise, register C is set to 0."""
-    register[C] = int(register[A] > B)
-    return register
-
-
-def gtrr(register, A, B, C):
-    """(greater-than register/register) sets register C to 1 if register A is greater than register B. Otherwise, register C is set to 0."""
-    register[C] = int(register[A] > register[B])
-    return register
-
-
-# Equality testing:
-
-
-def eqir(register, A, B, C):
-    """(equal immediate/register) sets register C to 1 if value A is equal to register B. Otherwise, register C is set to 0."""
-    register[C] = int(A == register[B])
-    return register
-
-
-def eqri(register, A, B, C):
-    """(equal register/immediate) sets register C to 1 if register A is equal to value B. Otherwise, register C is set to 0."""
-    register[C] = int(register[A] == B)
-    return register
-
-
-def eqrr(register, A, B, C):
-    """(equal register/register) sets register C to 1 if register A is equal to register B. Otherwise, register C is set to 0."""
-    register[C] = int(register[A] == register[B])
-    return register
-
-
-ALL_OPS = dict(
-    addr=addr,
-    addi=addi,
-    mulr=mulr,
-    muli=muli,
-    banr=banr,
-    bani=bani,
-    borr=borr,
-    bori=bori,
-    setr=setr,
-    seti=seti,
-    gtir=gtir,
-    gtri=gtri,
-    gtrr=gtrr,
-    eqir=eqir,
-    eqri=eqri,
-    eqrr=eqrr,
-)
-
-assert len(ALL_OPS) == 16
+# shared code lives in the aoc package at the root of the repository
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from aoc import elfcode  # noqa: E402
 
 test_input = """#ip 0
 seti 5 0 1
@@ -168,41 +25,39 @@ seti 8 0 4
 seti 9 0 5"""
 
 
-def parse(input_):
-    """"""
-    lines = input_.splitlines()
-    ip = strip_digits(lines[0])[0]
-    instructions = []
-    for line in lines[1:]:
-        instructions.append([line.split()[0]] + strip_digits(line))
+def halting_check(program):
+    """Find the only instruction that reads register 0, return its ip and the other register"""
+    for ip, (op, A, B, C) in enumerate(program):
+        if elfcode.OPCODES[op] == "eqrr" and 0 in (A, B):
+            return ip, B if A == 0 else A
+    raise ValueError("Program never compares against register 0")
 
-    return ip, instructions
 
+def halting_values(program, ip_loc):
+    """Yield the values of register 0 that would halt the program, in order, until they repeat"""
+    check_ip, check_reg = halting_check(program)
+    seen = set()
+    for register in elfcode.compile_program(program, ip_loc, watch=check_ip)([0] * 6):
+        value = register[check_reg]
+        if value in seen:
+            return
+        seen.add(value)
+        yield value
 
-if __name__ == "__main__":
-    ip_loc, instructions = parse(test_input)
 
+if __name__ == "__main__":
     with open("input.txt", "r") as fp:
-        ip_loc, instructions = parse(fp.read())
-
-    print(ip_loc, len(instructions))
-    wins = []
-    for j in range(10000):
-        init_register = new_register = [int(0)] * 6
-        init_register[0] = j
-        ip = new_register[ip_loc]
-        for i in count():
-            instruction, A, B, C = instructions[ip]
-            old_register = new_register[:]
-            new_register[ip_loc] = ip
-            new_register = ALL_OPS[instruction](new_register, A, B, C)
-            ip = new_register[ip_loc] + 1
-            if not ip < len(instructions):
-                break
-            if i > 1000:
-                # print(j, "failed")
-                break
-        if not i > 1000:
-            wins.append((j, i))
-    print(wins)
-    print(i, ip, new_register)
+        ip_loc, instructions = elfcode.parse(fp.read())
+    program = elfcode.decode(instructions)
+
+    # the program only halts when register 0 matches the value it's compared
+    # against, so the first value compared halts it fastest
+    values = halting_values(program, ip_loc)
+    print("Answer 1:", next(values))
+
+    # and the values eventually cycle, the last new one takes the longest. The
+    # compiler does the program's count-up division loop as a single division,
+    # so getting there takes thousands of outer loops rather than billions of steps
+    for value in values:
+        pass
+    print("Answer 2:", value)
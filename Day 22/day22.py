@@ -8,8 +8,16 @@ https://adventofcode.com/2018/day/22
 Copyright David Hoffman, 2018
 """
 
+import os
+import sys
 import numpy as np
-import networkx as nx
+
+# shared code lives in the aoc package at the root of the repository
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from aoc import counters  # noqa: E402
+from aoc.lazy import lazy_import  # noqa: E402
+
+nx = lazy_import("networkx")
 
 translation = str.maketrans("012", ".=|")
 
@@ -129,10 +137,14 @@ if __name__ == "__main__":
                 continue
             visited[(newpos, eq)] = time
             heappush(heap, (time, newpos.real, newpos.imag, eq))
+            if counters.ENABLED:
+                counters.incr("day22.heap_pushes")
 
     while True:
         # It's annoying we cannot use the heap with complex numbers because they cannot be ordered...
         time, x, y, eq = heappop(heap)
+        if counters.ENABLED:
+            counters.incr("day22.heap_pops")
         pos = x + 1j * y
         if (pos, eq) == (target, TORCH):
             break
@@ -8,10 +8,15 @@ https://adventofcode.com/2018/day/23
 Copyright David Hoffman, 2018
 """
 
+import os
+import sys
 import numpy as np
-import tqdm
 import re
 
+# shared code lives in the aoc package at the root of the repository
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from aoc.lazy import progress  # noqa: E402
+
 re_digits = re.compile(r"-?\d+")
 
 
@@ -94,7 +99,7 @@ if __name__ == "__main__":
     print("Answer 1:", inrange(pos[radii.argmax()], pos, radii.max()))
 
     all_points = []
-    for p, r in zip(tqdm.tqdm(pos), radii):
+    for p, r in zip(progress(pos), radii):
         all_points.extend(list(find_best_points(p, r + 1)))
 
     # print(all_points)
@@ -8,9 +8,16 @@ https://adventofcode.com/2018/day/25
 Copyright David Hoffman, 2018
 """
 
-import networkx as nx
+import os
+import sys
 from itertools import combinations
-import matplotlib.pyplot as plt
+
+# shared code lives in the aoc package at the root of the repository
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from aoc.lazy import lazy_import, PLOT  # noqa: E402
+
+nx = lazy_import("networkx")
+plt = lazy_import("matplotlib.pyplot")
 
 
 def manhattan(pos0, pos1):
@@ -106,6 +113,7 @@ if __name__ == "__main__":
         assert find_constellations(parse(test_input)) == test_result
 
     with open("input.txt", "r") as fp:
-        print("Answer 1:", find_constellations(parse(fp.read()), diagnostics=True))
+        print("Answer 1:", find_constellations(parse(fp.read()), diagnostics=PLOT))
 
-    plt.show()
+    if PLOT:
+        plt.show()
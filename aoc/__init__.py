@@ -0,0 +1,10 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# __init__.py
+"""
+Shared tooling for the Advent of Code 2018 solvers
+
+The solvers themselves live in the ``Day NN`` directories and are run as
+scripts from their own directory, this package holds the bits that are
+common to all of them.
+"""
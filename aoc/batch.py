@@ -0,0 +1,235 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# batch.py
+"""
+Solve many puzzle inputs for one day in parallel
+
+The inputs are spread over a process pool with one worker per core. Each
+worker runs the day's solver as ``__main__`` from a scratch directory where
+the input is linked as ``input.txt``, so the solvers don't need to know
+about batches at all. Each worker is reused for a few inputs, so heavy
+imports like numpy are only paid for once in a while, and then replaced
+so that whatever the solvers leave behind doesn't build up.
+
+Results are written as JSON lines in the same order as the inputs. A
+solver that fails or runs out of time gets an ``error`` instead of answers
+and the batch carries on, even if it takes its worker down with it.
+
+Usage:
+
+    python -m aoc.batch DAY INPUTS [--jobs N] [--timeout SECONDS] [--tasks-per-worker N]
+
+where INPUTS is either a directory (every file in it is an input) or a
+manifest file listing one input path per line.
+"""
+
+import io
+import os
+import sys
+import json
+import time
+import runpy
+import signal
+import shutil
+import argparse
+import tempfile
+import contextlib
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from .bench import find_days, missing_parts, re_answer
+
+# inputs a worker solves before it's replaced
+TASKS_PER_WORKER = 10
+
+
+class Timeout(Exception):
+    """The solver took too long"""
+
+
+def _alarm(signum, frame):
+    raise Timeout()
+
+
+def read_inputs(path):
+    """List the input files in a directory or manifest"""
+    if os.path.isdir(path):
+        names = sorted(os.listdir(path))
+        return [os.path.join(path, name) for name in names if not name.startswith(".")]
+
+    root = os.path.dirname(os.path.abspath(path))
+    with open(path, "r") as fp:
+        lines = [line.strip() for line in fp]
+    # paths in a manifest are relative to the manifest
+    return [os.path.join(root, line) for line in lines if line and not line.startswith("#")]
+
+
+def parse_answers(output):
+    """Pull the answers out of a solver's output
+
+    An answer label with nothing after it takes the lines up to the next
+    answer, for answers like Day 10's that are drawn over several lines.
+    """
+    answers = {}
+    part = None
+    for line in output.splitlines():
+        match = re_answer.match(line)
+        if match is not None:
+            part = None
+            if match.group(1) not in answers:
+                answers[match.group(1)] = match.group(2).strip()
+                if not answers[match.group(1)]:
+                    part = match.group(1)
+        elif part is not None:
+            answers[part] = (answers[part] + "\n" + line).strip("\n")
+    return answers
+
+
+def _check(day, result):
+    """Mark a result that finished without all of the day's answers"""
+    missing = missing_parts(day, [int(part) for part in result["answers"]])
+    if missing and result["error"] is None:
+        result["error"] = "missing part {}".format(", ".join(map(str, missing)))
+    return result
+
+
+def solve(script, input_path, timeout=None):
+    """Run script on input_path in this process and return a result dict"""
+    result = dict(input=input_path, answers={}, wall_s=None, error=None)
+    workdir = tempfile.mkdtemp(prefix="aoc_batch_")
+    cwd = os.getcwd()
+    argv = sys.argv[:]
+    output = io.StringIO()
+    start = time.perf_counter()
+    try:
+        os.symlink(os.path.abspath(input_path), os.path.join(workdir, "input.txt"))
+        os.chdir(workdir)
+        sys.argv[:] = [script]
+        if timeout:
+            signal.signal(signal.SIGALRM, _alarm)
+            signal.setitimer(signal.ITIMER_REAL, timeout)
+        with contextlib.redirect_stdout(output):
+            runpy.run_path(script, run_name="__main__")
+    except Timeout:
+        result["error"] = "timeout"
+    except BaseException as e:
+        # anything at all, including sys.exit, only fails this input
+        result["error"] = "{}: {}".format(type(e).__name__, e)
+    finally:
+        if timeout:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+        result["wall_s"] = round(time.perf_counter() - start, 6)
+        os.chdir(cwd)
+        sys.argv[:] = argv
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    result["answers"] = parse_answers(output.getvalue())
+    return result
+
+
+def _failed(input_path, error):
+    return dict(input=input_path, answers={}, wall_s=None, error=error)
+
+
+def _solve_marked(marker, script, input_path, timeout):
+    """solve, leaving the file marker behind if the worker dies while it's running"""
+    open(marker, "w").close()
+    try:
+        return solve(script, input_path, timeout)
+    finally:
+        os.remove(marker)
+
+
+def _run_pool(script, inputs, markers, jobs, timeout, tasks_per_worker):
+    """Solve inputs on a fresh pool, yielding (index, result), result is None if the pool broke"""
+    kwargs = dict(max_workers=jobs)
+    if tasks_per_worker and sys.version_info >= (3, 11):
+        kwargs["max_tasks_per_child"] = tasks_per_worker
+    with ProcessPoolExecutor(**kwargs) as executor:
+        futures = [
+            (i, executor.submit(_solve_marked, markers[i], script, path, timeout))
+            for i, path in inputs
+        ]
+        for i, future in futures:
+            try:
+                yield i, future.result()
+            except BrokenProcessPool:
+                yield i, None
+            except Exception as e:
+                yield i, _failed(dict(inputs)[i], "{}: {}".format(type(e).__name__, e))
+
+
+def run_batch(day, inputs, jobs=None, timeout=None, tasks_per_worker=TASKS_PER_WORKER):
+    """Solve all inputs for day, yielding results in input order as they finish
+
+    A worker that dies (a crash, the OOM killer, os._exit) breaks the whole
+    pool. The inputs that hadn't started are then put on a new pool and the
+    ones that were running at the time are each run again on their own, so
+    only the input that takes its worker down gets an error.
+    """
+    scripts = dict(find_days())
+    if day not in scripts:
+        raise ValueError("No solver for day {}".format(day))
+    script = scripts[day]
+
+    # never pop up plot windows
+    os.environ.setdefault("MPLBACKEND", "Agg")
+    jobs = jobs or os.cpu_count()
+    results = [None] * len(inputs)
+    done = 0
+    marker_dir = tempfile.mkdtemp(prefix="aoc_batch_running_")
+    markers = [os.path.join(marker_dir, str(i)) for i in range(len(inputs))]
+    todo = list(enumerate(inputs))
+    try:
+        while todo:
+            broken = []
+            for i, result in _run_pool(script, todo, markers, jobs, timeout, tasks_per_worker):
+                if result is None:
+                    broken.append((i, inputs[i]))
+                    continue
+                results[i] = _check(day, result)
+                while done < len(results) and results[done] is not None:
+                    yield results[done]
+                    done += 1
+
+            # the inputs that were running when the pool broke left their markers behind
+            running = [(i, path) for i, path in broken if os.path.exists(markers[i])]
+            if broken and not running:
+                # it died before anything started, make sure something moves on
+                running = broken[:1]
+            for i, path in running:
+                if os.path.exists(markers[i]):
+                    os.remove(markers[i])
+                # alone, so if the worker dies this input did it
+                for _, result in _run_pool(script, [(i, path)], markers, 1, timeout, None):
+                    results[i] = _check(day, result) if result else _failed(path, "worker died")
+            todo = [(i, path) for i, path in broken if results[i] is None]
+            while done < len(results) and results[done] is not None:
+                yield results[done]
+                done += 1
+    finally:
+        shutil.rmtree(marker_dir, ignore_errors=True)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Solve many inputs for one day in parallel")
+    parser.add_argument("day", type=int)
+    parser.add_argument("inputs", help="directory of inputs or a manifest listing them")
+    parser.add_argument("--jobs", "-j", type=int, default=None, help="workers (default all cores)")
+    parser.add_argument("--timeout", type=float, default=None, help="seconds allowed per input")
+    parser.add_argument(
+        "--tasks-per-worker",
+        type=int,
+        default=TASKS_PER_WORKER,
+        help="inputs a worker solves before it's replaced (default %(default)s, 0 for never)",
+    )
+    args = parser.parse_args(argv)
+
+    inputs = read_inputs(args.inputs)
+    for result in run_batch(args.day, inputs, args.jobs, args.timeout, args.tasks_per_worker):
+        print(json.dumps(result))
+        sys.stdout.flush()
+
+
+if __name__ == "__main__":
+    main()
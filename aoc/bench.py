@@ -0,0 +1,260 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# bench.py
+"""
+Benchmark runner for all the Day NN solvers
+
+Each solver is run in a fresh interpreter from its own directory (so that
+``open("input.txt")`` keeps working) and a snapshot of wall time, CPU time
+and peak RSS is taken every time the solver prints an ``Answer N:`` (or
+``Part N:``) line. The difference between snapshots gives the cost of each
+part. A solver that finishes without printing all of its parts gets a
+``missing`` row for each one it left out.
+
+Usage:
+
+    python -m aoc.bench [DAY ...] [--timeout SECONDS] [--format csv|json] [--input FILE]
+"""
+
+import os
+import re
+import sys
+import csv
+import json
+import time
+import runpy
+import builtins
+import argparse
+import resource
+import tempfile
+import subprocess
+
+# the root of the repository, where all the Day NN directories are
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+re_day = re.compile(r"Day (\d+)$")
+re_answer = re.compile(r"(?:Answer|Part)\s*(\d+)\s*:?\s*(.*)", re.DOTALL)
+
+# the last day only has one part
+ONE_PART_DAYS = (25,)
+
+FIELDS = ("day", "part", "answer", "wall_s", "cpu_s", "peak_rss_kb", "status")
+
+
+def find_days(root=ROOT):
+    """Return a sorted list of (day number, solver script) found under root"""
+    days = []
+    for name in os.listdir(root):
+        match = re_day.match(name)
+        if match is None:
+            continue
+        day = int(match.group(1))
+        script = os.path.join(root, name, "day{}.py".format(day))
+        if os.path.isfile(script):
+            days.append((day, script))
+    return sorted(days)
+
+
+def missing_parts(day, parts):
+    """The parts of day that aren't among parts"""
+    expected = (1,) if day in ONE_PART_DAYS else (1, 2)
+    return [part for part in expected if part not in parts]
+
+
+def peak_rss_kb():
+    """Peak resident set size of this process in kB"""
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # macOS reports bytes, linux reports kilobytes
+    if sys.platform == "darwin":
+        rss //= 1024
+    return rss
+
+
+def snapshot():
+    """Wall time, CPU time and peak RSS right now"""
+    return time.perf_counter(), time.process_time(), peak_rss_kb()
+
+
+def _child(script, result_file):
+    """Run script as __main__ recording a snapshot at each answer
+
+    Every event is written to result_file as a line of JSON as soon as it
+    happens so that the parent still gets the finished parts if it has to kill
+    us on a timeout.
+    """
+    print_ = builtins.print
+    fp = open(result_file, "w")
+
+    def write(**event):
+        fp.write(json.dumps(event) + "\n")
+        fp.flush()
+
+    # some solvers print the label and the answer with separate calls
+    pending = []
+
+    def recording_print(*args, **kwargs):
+        print_(*args, **kwargs)
+        text = " ".join(str(a) for a in args)
+        if pending:
+            event = pending.pop()
+            event["answer"] = text.strip()
+            write(**event)
+            return
+        match = re_answer.match(text)
+        if match is not None:
+            wall, cpu, rss = snapshot()
+            event = dict(part=int(match.group(1)), answer=match.group(2).strip())
+            event.update(wall=wall, cpu=cpu, rss=rss)
+            if event["answer"] or len(args) > 1:
+                write(**event)
+            else:
+                pending.append(event)
+
+    builtins.print = recording_print
+    sys.argv[:] = [script]
+    wall, cpu, rss = snapshot()
+    write(part=0, wall=wall, cpu=cpu, rss=rss)
+    status = "ok"
+    try:
+        runpy.run_path(script, run_name="__main__")
+    except BaseException as e:
+        status = "{}: {}".format(type(e).__name__, e)
+    finally:
+        builtins.print = print_
+
+    write(status=status)
+    fp.close()
+
+
+def _parts(events):
+    """Convert raw events from the child into per part costs"""
+    if not events:
+        return [], "crashed"
+    last = events[0]
+    status = events[-1].get("status", "crashed")
+    seen = set()
+    parts = []
+    for event in events[1:]:
+        # some solvers print the same answer more than once, keep the first
+        if "part" not in event or event["part"] in seen:
+            continue
+        seen.add(event["part"])
+        parts.append(
+            dict(
+                part=event["part"],
+                answer=event["answer"],
+                wall_s=round(event["wall"] - last["wall"], 6),
+                cpu_s=round(event["cpu"] - last["cpu"], 6),
+                peak_rss_kb=event["rss"],
+                status="ok",
+            )
+        )
+        last = event
+    return parts, status
+
+
+def run_solver(script, cwd=None, timeout=None, env=None):
+    """Run a single solver in a subprocess and return a list of per part results
+
+    Parts that finished are always reported, if the solver then fails or times
+    out an extra row with part 0 carries the status. The same happens when no
+    answer was printed at all.
+    """
+    if cwd is None:
+        cwd = os.path.dirname(os.path.abspath(script))
+
+    child_env = dict(os.environ if env is None else env)
+    child_env["PYTHONPATH"] = os.pathsep.join(filter(None, (ROOT, child_env.get("PYTHONPATH"))))
+    # never pop up plot windows
+    child_env.setdefault("MPLBACKEND", "Agg")
+
+    fd, result_file = tempfile.mkstemp(suffix=".jsonl")
+    os.close(fd)
+    timed_out = False
+    try:
+        cmd = [sys.executable, "-m", "aoc.bench", "--child", os.path.abspath(script), result_file]
+        try:
+            subprocess.run(
+                cmd,
+                cwd=cwd,
+                env=child_env,
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
+                timeout=timeout,
+            )
+        except subprocess.TimeoutExpired:
+            timed_out = True
+        with open(result_file, "r") as fp:
+            events = [json.loads(line) for line in fp if line.endswith("\n")]
+    finally:
+        os.remove(result_file)
+
+    parts, status = _parts(events)
+    if timed_out:
+        status = "timeout"
+
+    if status != "ok" or not parts:
+        parts.append(
+            dict(part=0, answer="", wall_s=None, cpu_s=None, peak_rss_kb=None, status=status)
+        )
+    return parts
+
+
+def run_all(days=None, timeout=None, input_path=None):
+    """Benchmark the requested days (all by default), yielding a row per part
+
+    If input_path is given it's used as the input of every day instead of the
+    day's own input.txt (see aoc.generate).
+    """
+    for day, script in find_days():
+        if days and day not in days:
+            continue
+        if input_path is None:
+            rows = run_solver(script, timeout=timeout)
+        else:
+            with tempfile.TemporaryDirectory(prefix="aoc_bench_") as workdir:
+                os.symlink(os.path.abspath(input_path), os.path.join(workdir, "input.txt"))
+                rows = run_solver(script, cwd=workdir, timeout=timeout)
+        if all(row["status"] == "ok" for row in rows):
+            for part in missing_parts(day, [row["part"] for row in rows]):
+                rows.append(
+                    dict(
+                        part=part,
+                        answer="",
+                        wall_s=None,
+                        cpu_s=None,
+                        peak_rss_kb=None,
+                        status="missing",
+                    )
+                )
+        for row in rows:
+            yield dict(day=day, **row)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Time every Advent of Code solver")
+    parser.add_argument("days", nargs="*", type=int, help="days to run (default all)")
+    parser.add_argument("--timeout", type=float, default=None, help="seconds allowed per day")
+    parser.add_argument("--format", choices=("csv", "json"), default="csv")
+    parser.add_argument("--input", default=None, help="use this input instead of input.txt")
+    args = parser.parse_args(argv)
+
+    if args.format == "csv":
+        writer = csv.DictWriter(sys.stdout, FIELDS)
+        writer.writeheader()
+        write = writer.writerow
+    else:
+
+        def write(row):
+            print(json.dumps(row))
+
+    for row in run_all(args.days, args.timeout, args.input):
+        write(row)
+        sys.stdout.flush()
+
+
+if __name__ == "__main__":
+    if len(sys.argv) == 4 and sys.argv[1] == "--child":
+        _child(*sys.argv[2:])
+    else:
+        main()
@@ -0,0 +1,123 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# cache.py
+"""
+Cache parsed puzzle inputs on disk
+
+Parsing is keyed by a hash of the raw input bytes (and the name and version
+of the parser) and the result, a numpy array or a tuple of them, is stored
+as an uncompressed ``.npz`` file. When the cache grows past its size limit
+the least recently used entries are removed.
+
+The cache lives in ``$XDG_CACHE_HOME/aoc2018`` (``~/.cache/aoc2018``) unless
+``AOC_CACHE_DIR`` is set, its size is limited by ``AOC_CACHE_BYTES``
+(256 MB by default) and it can be turned off with ``AOC_CACHE=0``.
+"""
+
+import os
+import hashlib
+import tempfile
+import numpy as np
+
+CACHE_DIR = os.environ.get(
+    "AOC_CACHE_DIR",
+    os.path.join(os.environ.get("XDG_CACHE_HOME", os.path.expanduser("~/.cache")), "aoc2018"),
+)
+MAX_BYTES = int(os.environ.get("AOC_CACHE_BYTES", 256 * 1024**2))
+ENABLED = os.environ.get("AOC_CACHE", "1") != "0"
+
+# marks an npz that holds a single array rather than a tuple
+SINGLE = "single"
+
+
+def key(raw, name, version=0):
+    """The cache key for raw input bytes parsed by parser name"""
+    h = hashlib.sha256(raw)
+    h.update("{}:{}".format(name, version).encode())
+    return h.hexdigest()
+
+
+def _path(k):
+    return os.path.join(CACHE_DIR, k + ".npz")
+
+
+def _read(path):
+    """Read an entry back into an array or tuple of arrays"""
+    with np.load(path, allow_pickle=False) as npz:
+        if SINGLE in npz.files:
+            return npz[SINGLE]
+        return tuple(npz["arr_{}".format(i)] for i in range(len(npz.files)))
+
+
+def _write(path, result):
+    """Atomically write an entry so that concurrent readers never see half a file"""
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=CACHE_DIR, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as fp:
+            if isinstance(result, tuple):
+                np.savez(fp, *result)
+            else:
+                np.savez(fp, **{SINGLE: result})
+        os.replace(tmp, path)
+    except BaseException:
+        os.remove(tmp)
+        raise
+
+
+def evict(max_bytes=None):
+    """Remove the least recently used entries until the cache fits in max_bytes"""
+    if max_bytes is None:
+        max_bytes = MAX_BYTES
+    try:
+        entries = [e for e in os.scandir(CACHE_DIR) if e.name.endswith(".npz")]
+    except FileNotFoundError:
+        return
+    entries = sorted(((e.stat().st_mtime, e.stat().st_size, e.path) for e in entries))
+    total = sum(size for _, size, _ in entries)
+    for _, size, path in entries:
+        if total <= max_bytes:
+            break
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            # someone else got there first
+            pass
+        total -= size
+
+
+def load(filename, parser, name, version=0):
+    """Parse filename with parser, or get the result from the cache
+
+    parser is called with the text of the file and must return a numpy array
+    or a tuple of them. name identifies the parser in the cache key, bump
+    version whenever the parser's output changes.
+    """
+    with open(filename, "rb") as fp:
+        raw = fp.read()
+
+    if not ENABLED:
+        return parser(raw.decode())
+
+    path = _path(key(raw, name, version))
+    try:
+        result = _read(path)
+        # mark as recently used
+        os.utime(path)
+        return result
+    except (OSError, ValueError, KeyError):
+        # missing or unreadable, parse it again
+        pass
+
+    result = parser(raw.decode())
+    if isinstance(result, (tuple, list)):
+        result = tuple(np.asarray(r) for r in result)
+    else:
+        result = np.asarray(result)
+    try:
+        _write(path, result)
+        evict()
+    except OSError:
+        # a cache we can't write to is no reason to fail
+        pass
+    return result
@@ -0,0 +1,167 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# counters.py
+"""
+Named counters and timers for the solvers' hot loops
+
+Everything is off unless the ``AOC_COUNTERS`` environment variable is set
+when the solver starts. Hot loops guard their calls with ``if ENABLED:`` and
+``timed`` hands back the undecorated function, so a disabled build costs
+nothing but a global lookup and a branch.
+
+When enabled the results are written when the process exits, as JSON to
+stderr if ``AOC_COUNTERS=1``, or to the file it names. A file ending in
+``.folded`` gets the collapsed stack format that flamegraph.pl and
+speedscope read, with timer nesting as the stack and self time in
+microseconds as the value. Relative paths are relative to the solver's
+directory.
+"""
+
+import os
+import sys
+import json
+import time
+import atexit
+import functools
+import contextlib
+from collections import Counter, defaultdict
+
+ENABLED = bool(os.environ.get("AOC_COUNTERS"))
+
+counts = Counter()
+# total and self time per stack of timer names, joined with ";"
+total_times = defaultdict(float)
+self_times = defaultdict(float)
+calls = Counter()
+
+# currently running timers, [name, start, time spent in children]
+_stack = []
+
+
+def incr(name, n=1):
+    """Add n to counter name"""
+    counts[name] += n
+
+
+def start(name):
+    """Start timer name nested in whatever timer is running"""
+    _stack.append([name, time.perf_counter(), 0.0])
+
+
+def stop():
+    """Stop the innermost timer"""
+    stack = ";".join(frame[0] for frame in _stack)
+    name, started, children = _stack.pop()
+    elapsed = time.perf_counter() - started
+    total_times[stack] += elapsed
+    self_times[stack] += elapsed - children
+    calls[stack] += 1
+    if _stack:
+        _stack[-1][2] += elapsed
+
+
+@contextlib.contextmanager
+def timer(name):
+    """Time a block of code, does nothing when disabled"""
+    if not ENABLED:
+        yield
+        return
+    start(name)
+    try:
+        yield
+    finally:
+        stop()
+
+
+def timed(name=None):
+    """Decorator timing every call to a function, when disabled the function is returned as is
+
+    Generators are timed while they run, not while they're suspended.
+    """
+
+    def decorator(func):
+        if not ENABLED:
+            return func
+        label = name or func.__qualname__
+
+        if _is_generator(func):
+
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                gen = func(*args, **kwargs)
+                while True:
+                    start(label)
+                    try:
+                        item = next(gen)
+                    except StopIteration as e:
+                        return e.value
+                    finally:
+                        stop()
+                    yield item
+
+        else:
+
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                start(label)
+                try:
+                    return func(*args, **kwargs)
+                finally:
+                    stop()
+
+        return wrapper
+
+    return decorator
+
+
+def _is_generator(func):
+    return bool(func.__code__.co_flags & 0x20)
+
+
+def reset():
+    """Clear all counters and timers"""
+    counts.clear()
+    total_times.clear()
+    self_times.clear()
+    calls.clear()
+    del _stack[:]
+
+
+def as_dict():
+    """All counters and timers as a JSON friendly dict"""
+    return dict(
+        counters=dict(counts),
+        timers={
+            stack: dict(calls=calls[stack], total_s=total_times[stack], self_s=self_times[stack])
+            for stack in total_times
+        },
+    )
+
+
+def dump_json(fp):
+    json.dump(as_dict(), fp, indent=2, sort_keys=True)
+    fp.write("\n")
+
+
+def dump_folded(fp):
+    """Write the timers in collapsed stack format (counters can't be represented)"""
+    for stack, seconds in sorted(self_times.items()):
+        fp.write("{} {}\n".format(stack, int(round(seconds * 1e6))))
+
+
+def dump(destination=None):
+    """Write everything to destination (see module docstring), defaults to AOC_COUNTERS"""
+    if destination is None:
+        destination = os.environ.get("AOC_COUNTERS", "1")
+    if destination == "1":
+        dump_json(sys.stderr)
+        return
+    with open(destination, "w") as fp:
+        if destination.endswith(".folded"):
+            dump_folded(fp)
+        else:
+            dump_json(fp)
+
+
+if ENABLED:
+    atexit.register(dump)
@@ -0,0 +1,465 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# elfcode.py
+"""
+The ElfCode virtual machine shared by Days 16, 19 and 21
+
+https://adventofcode.com/2018/day/16
+https://adventofcode.com/2018/day/19
+https://adventofcode.com/2018/day/21
+
+A program is first decoded into a tuple of ``(opcode, A, B, C)`` integer
+tuples, where ``opcode`` indexes ``OPCODES``. The decoded program can then
+either be interpreted with ``run`` or turned into a single generated Python
+function with ``compile_program``, which keeps the registers in local
+variables and is much faster for long running programs.
+"""
+
+import re
+
+from . import counters
+
+re_digits = re.compile(r"\d+")
+
+
+def strip_digits(input_):
+    """Strip numbers from a string"""
+    return list(map(int, re_digits.findall(input_)))
+
+
+# Addition:
+
+
+def addr(register, A, B, C):
+    """(add register) stores into register C the result of adding register A and register B."""
+    register[C] = register[A] + register[B]
+    return register
+
+
+def addi(register, A, B, C):
+    """(add immediate) stores into register C the result of adding register A and value B."""
+    register[C] = register[A] + B
+    return register
+
+
+# Multiplication:
+
+
+def mulr(register, A, B, C):
+    """(multiply register) stores into register C the result of multiplying register A and register B."""
+    register[C] = register[A] * register[B]
+    return register
+
+
+def muli(register, A, B, C):
+    """(multiply immediate) stores into register C the result of multiplying register A and value B."""
+    register[C] = register[A] * B
+    return register
+
+
+# Bitwise AND:
+
+
+def banr(register, A, B, C):
+    """(bitwise AND register) stores into register C the result of the bitwise AND of register A and register B."""
+    register[C] = register[A] & register[B]
+    return register
+
+
+def bani(register, A, B, C):
+    """(bitwise AND immediate) stores into register C the result of the bitwise AND of register A and value B."""
+    register[C] = register[A] & B
+    return register
+
+
+# Bitwise OR:
+
+
+def borr(register, A, B, C):
+    """(bitwise OR register) stores into register C the result of the bitwise OR of register A and register B."""
+    register[C] = register[A] | register[B]
+    return register
+
+
+def bori(register, A, B, C):
+    """(bitwise OR immediate) stores into register C the result of the bitwise OR of register A and value B."""
+    register[C] = register[A] | B
+    return register
+
+
+# Assignment:
+
+
+def setr(register, A, B, C):
+    """(set register) copies the contents of register A into register C. (Input B is ignored.)"""
+    register[C] = register[A]
+    return register
+
+
+def seti(register, A, B, C):
+    """(set immediate) stores value A into register C. (Input B is ignored.)"""
+    register[C] = A
+    return register
+
+
+# Greater-than testing:
+
+
+def gtir(register, A, B, C):
+    """(greater-than immediate/register) sets register C to 1 if value A is greater than register B. Otherwise, register C is set to 0."""
+    register[C] = int(A > register[B])
+    return register
+
+
+def gtri(register, A, B, C):
+    """(greater-than register/immediate) sets register C to 1 if register A is greater than value B. Otherwise, register C is set to 0."""
+    register[C] = int(register[A] > B)
+    return register
+
+
+def gtrr(register, A, B, C):
+    """(greater-than register/register) sets register C to 1 if register A is greater than register B. Otherwise, register C is set to 0."""
+    register[C] = int(register[A] > register[B])
+    return register
+
+
+# Equality testing:
+
+
+def eqir(register, A, B, C):
+    """(equal immediate/register) sets register C to 1 if value A is equal to register B. Otherwise, register C is set to 0."""
+    register[C] = int(A == register[B])
+    return register
+
+
+def eqri(register, A, B, C):
+    """(equal register/immediate) sets register C to 1 if register A is equal to value B. Otherwise, register C is set to 0."""
+    register[C] = int(register[A] == B)
+    return register
+
+
+def eqrr(register, A, B, C):
+    """(equal register/register) sets register C to 1 if register A is equal to register B. Otherwise, register C is set to 0."""
+    register[C] = int(register[A] == register[B])
+    return register
+
+
+ALL_OPS = dict(
+    addr=addr,
+    addi=addi,
+    mulr=mulr,
+    muli=muli,
+    banr=banr,
+    bani=bani,
+    borr=borr,
+    bori=bori,
+    setr=setr,
+    seti=seti,
+    gtir=gtir,
+    gtri=gtri,
+    gtrr=gtrr,
+    eqir=eqir,
+    eqri=eqri,
+    eqrr=eqrr,
+)
+
+assert len(ALL_OPS) == 16
+
+# the opcode of a decoded instruction is an index into these
+OPCODES = tuple(ALL_OPS)
+OP_FUNCS = tuple(ALL_OPS.values())
+
+# python expressions for each operation in terms of register locals r0, r1, ...
+# "r{A}" is a register and "{A}" is a value
+EXPRESSIONS = dict(
+    addr="r{A} + r{B}",
+    addi="r{A} + {B}",
+    mulr="r{A} * r{B}",
+    muli="r{A} * {B}",
+    banr="r{A} & r{B}",
+    bani="r{A} & {B}",
+    borr="r{A} | r{B}",
+    bori="r{A} | {B}",
+    setr="r{A}",
+    seti="{A}",
+    gtir="1 if {A} > r{B} else 0",
+    gtri="1 if r{A} > {B} else 0",
+    gtrr="1 if r{A} > r{B} else 0",
+    eqir="1 if {A} == r{B} else 0",
+    eqri="1 if r{A} == {B} else 0",
+    eqrr="1 if r{A} == r{B} else 0",
+)
+
+# which of A and B are registers for each operation
+READS = {
+    name: tuple(arg for arg in "AB" if "r{" + arg + "}" in expression)
+    for name, expression in EXPRESSIONS.items()
+}
+
+
+def parse(input_):
+    """Parse a program with an instruction pointer declaration, e.g. Day 19 and 21"""
+    lines = input_.splitlines()
+    ip = strip_digits(lines[0])[0]
+    instructions = []
+    for line in lines[1:]:
+        instructions.append([line.split()[0]] + strip_digits(line))
+
+    return ip, instructions
+
+
+def decode(instructions):
+    """Convert a list of [name, A, B, C] instructions into a compact program"""
+    opcode = {name: i for i, name in enumerate(OPCODES)}
+    return tuple((opcode[name], A, B, C) for name, A, B, C in instructions)
+
+
+def run(program, register, ip_reg=None, max_steps=None):
+    """Interpret a decoded program on register, in place
+
+    If ip_reg is given the instruction pointer is bound to that register (Day
+    19), otherwise the program is executed once from top to bottom (Day 16).
+    Returns the number of instructions executed.
+    """
+    ops = OP_FUNCS
+    num_instructions = len(program)
+    if ip_reg is None:
+        for op, A, B, C in program:
+            ops[op](register, A, B, C)
+        if counters.ENABLED:
+            counters.incr("elfcode.steps", num_instructions)
+        return num_instructions
+
+    ip = register[ip_reg]
+    steps = 0
+    while 0 <= ip < num_instructions:
+        if steps == max_steps:
+            break
+        op, A, B, C = program[ip]
+        register[ip_reg] = ip
+        ops[op](register, A, B, C)
+        ip = register[ip_reg] + 1
+        steps += 1
+    if counters.ENABLED:
+        counters.incr("elfcode.steps", steps)
+    return steps
+
+
+def _statement(instruction):
+    """Python source for a single decoded instruction"""
+    op, A, B, C = instruction
+    name = OPCODES[op]
+    return "r{C} = {expr}".format(C=C, expr=EXPRESSIONS[name].format(A=A, B=B))
+
+
+# comparisons always leave a 0 or 1 in their output register
+COMPARISONS = {"gtir", "gtri", "gtrr", "eqir", "eqri", "eqrr"}
+
+# maximum number of instructions to inline into a single block
+MAX_INLINE = 256
+
+
+def _indent(lines):
+    return ["    " + line for line in lines]
+
+
+def _division_loop(program, i, ip_reg):
+    """Recognise a loop starting at i that divides by counting up, as in Day 21
+
+        seti 0 _ t          t = 0
+        addi t 1 u          while (t + 1) * K <= n:
+        muli u K u              t += 1
+        gtrr u n u
+        addr u ip ip
+        addi ip 1 ip
+        seti X _ ip         (leaves for X + 1)
+        addi t 1 t
+        seti i _ ip         (back to the addi)
+
+    Returns the source that does the same in one go, the number of
+    instructions it stands for on top of 7 per step of t, and where it
+    leaves for, or None if there's no such loop at i.
+    """
+    names = ("seti", "addi", "muli", "gtrr", "addr", "addi", "seti", "addi", "seti")
+    if i + len(names) > len(program):
+        return None
+    loop = program[i : i + len(names)]
+    if tuple(OPCODES[op] for op, _, _, _ in loop) != names:
+        return None
+    t, u, K, n, X = loop[0][3], loop[1][3], loop[2][2], loop[3][2], loop[6][1]
+    ip = ip_reg
+    # (A, B, C) of each instruction, None for anything
+    expected = (
+        (0, None, t),
+        (t, 1, u),
+        (u, K, u),
+        (u, n, u),
+        (None, None, ip),
+        (ip, 1, ip),
+        (X, None, ip),
+        (t, 1, t),
+        (i, None, ip),
+    )
+    for instruction, pattern in zip(loop, expected):
+        if any(want is not None and got != want for got, want in zip(instruction[1:], pattern)):
+            return None
+    if sorted(loop[4][1:3]) != sorted((u, ip)) or len({t, u, n, ip}) < 4 or K <= 0:
+        return None
+    lines = [
+        "r{} = max(r{} // {}, 0)".format(t, n, K),
+        "r{} = 1".format(u),
+        "r{} = {}".format(ip, X),
+        "steps += 7 * r{}".format(t),
+    ]
+    # the seti before the loop, the last time round and the jump out
+    return lines, 6, X + 1
+
+
+def _straight(program, i, steps, ip_reg, watch, budget):
+    """Straight line source from instruction i until control leaves the block
+
+    Jumps to a target known at compile time (seti, or addi on the ip register)
+    and the common "comparison then addr onto the ip register" branch are
+    followed directly as long as they go forward, anything else goes back to
+    the dispatcher. Loops that divide by counting up (see _division_loop)
+    are done with a single division.
+    """
+
+    def goto(target, steps):
+        """Source to continue execution at target"""
+        if i < target < len(program) and target != watch and budget[0] > 0:
+            return _straight(program, target, steps, ip_reg, watch, budget)
+        return ["steps += {}".format(steps), "ip = {}".format(target), "continue"]
+
+    lines = []
+    flag = None
+    while True:
+        loop = _division_loop(program, i, ip_reg)
+        if loop is not None and not (watch is not None and i < watch < i + 9):
+            loop_lines, loop_steps, leave = loop
+            budget[0] -= 1
+            return lines + loop_lines + goto(leave, steps + loop_steps)
+
+        op, A, B, C = program[i]
+        name = OPCODES[op]
+        reads = [dict(A=A, B=B)[arg] for arg in READS[name]]
+        last = i == len(program) - 1
+        budget[0] -= 1
+        steps += 1
+        # the ip register only needs to be up to date when it's actually used
+        if ip_reg in reads or C == ip_reg or last:
+            lines.append("r{} = {}".format(ip_reg, i))
+        lines.append(_statement(program[i]))
+
+        if C == ip_reg:
+            # a jump, can we figure out where to?
+            others = [r for r in reads if r != ip_reg]
+            if name == "seti":
+                return lines + goto(A + 1, steps)
+            if name == "addi" and A == ip_reg:
+                return lines + goto(i + B + 1, steps)
+            if name == "addr" and len(others) == 1 and others[0] == flag:
+                lines.append("if r{}:".format(flag))
+                lines += _indent(goto(i + 2, steps))
+                lines.append("else:")
+                lines += _indent(goto(i + 1, steps))
+                return lines
+            return lines + ["steps += {}".format(steps), "ip = r{} + 1".format(ip_reg), "continue"]
+
+        if last or i + 1 == watch:
+            return lines + ["steps += {}".format(steps), "ip = {}".format(i + 1), "continue"]
+
+        flag = C if name in COMPARISONS else None
+        i += 1
+
+
+def _block(program, start, ip_reg, watch, names):
+    """Source for entering the program at start"""
+    lines = []
+    if start == watch:
+        lines.append("r{} = {}".format(ip_reg, start))
+        lines.append("yield ({})".format(names))
+    return lines + _straight(program, start, 0, ip_reg, watch, [MAX_INLINE])
+
+
+def _dispatch(program, lo, hi, ip_reg, watch, names):
+    """Binary search on ip to get to the right block in O(log n) comparisons"""
+    if hi - lo == 1:
+        return _block(program, lo, ip_reg, watch, names)
+    mid = (lo + hi) // 2
+    left = _dispatch(program, lo, mid, ip_reg, watch, names)
+    right = _dispatch(program, mid, hi, ip_reg, watch, names)
+    lines = ["if ip < {}:".format(mid)]
+    return lines + _indent(left) + ["else:"] + _indent(right)
+
+
+def _count_steps(lines):
+    """Report executed instructions to the counters whenever control leaves the function"""
+    counted = []
+    for line in lines:
+        stripped = line.lstrip()
+        if stripped.startswith(("yield ", "return ")):
+            indent = line[: len(line) - len(stripped)]
+            counted.append(indent + '_incr("elfcode.steps", steps - reported)')
+            counted.append(indent + "reported = steps")
+        counted.append(line)
+    return counted
+
+
+def source(program, ip_reg=None, num_registers=6, watch=None, count=False):
+    """Generate the python source of a compiled program, see compile_program"""
+    names = ", ".join("r{}".format(i) for i in range(num_registers))
+    for op, A, B, C in program:
+        used = [C] + [dict(A=A, B=B)[arg] for arg in READS[OPCODES[op]]]
+        if max(used) >= num_registers:
+            raise ValueError(
+                "Instruction {} uses more than {} registers".format(
+                    (OPCODES[op], A, B, C), num_registers
+                )
+            )
+
+    lines = ["def elfcode(registers, max_steps=None):"]
+    body = ["{} = registers".format(names)]
+    if ip_reg is None:
+        if watch is not None:
+            raise ValueError("Can only watch programs with an instruction pointer")
+        body += [_statement(instruction) for instruction in program]
+        body += ["registers[:] = {}".format(names), "steps = {}".format(len(program))]
+        body += ["return steps"]
+    else:
+        loop = ["if not 0 <= ip < {}:".format(len(program)), "    break"]
+        loop += ["if max_steps is not None and steps >= max_steps:"]
+        loop += ["    r{} = ip - 1".format(ip_reg), "    break"]
+        if program:
+            loop += _dispatch(program, 0, len(program), ip_reg, watch, names)
+        body += ["ip = r{}".format(ip_reg), "steps = 0", "while True:"]
+        body += ["    " + line for line in loop]
+        body += ["registers[:] = {}".format(names), "return steps"]
+    if count:
+        body = ["reported = 0"] + _count_steps(body)
+    lines += ["    " + line for line in body]
+    return "\n".join(lines) + "\n"
+
+
+def compile_program(program, ip_reg=None, num_registers=6, watch=None):
+    """Compile a decoded program into a single python function
+
+    The returned function takes a list of registers, runs the program on them
+    (updating the list in place when it halts) and returns the number of
+    instructions executed. The optional max_steps argument is only checked
+    when a jump goes back to the dispatcher so the program may run slightly
+    past it.
+
+    If watch is given the function is a generator instead, yielding a tuple
+    of the registers every time the instruction pointer reaches watch (before
+    that instruction is executed).
+
+    When the counters are enabled the generated code reports the number of
+    instructions executed to them, otherwise it doesn't even check.
+    """
+    namespace = dict(_incr=counters.incr)
+    code = source(program, ip_reg, num_registers, watch, counters.ENABLED)
+    exec(compile(code, "<elfcode>", "exec"), namespace)
+    func = namespace["elfcode"]
+    func.source = code
+    return func
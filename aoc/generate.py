@@ -0,0 +1,324 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# generate.py
+"""
+Generate synthetic puzzle inputs at any scale
+
+Each ``dayN`` function returns the text of a valid input for that day with
+``n`` setting the size of the problem, so that the solvers can be timed on
+inputs much bigger than the real ones. All generators are deterministic for
+a given seed.
+
+Usage:
+
+    python -m aoc.generate DAY N [KEY=VALUE ...] [--seed SEED] [-o OUTPUT]
+
+where KEY=VALUE sets any other argument of the day's generator, for
+instance ``python -m aoc.generate 3 100000 size=10000`` for 100,000 claims
+on a 10,000 square inch fabric, and then, for instance, ``python -m aoc.bench DAY --input OUTPUT``.
+"""
+
+import ast
+import sys
+import string
+import inspect
+import argparse
+import datetime
+import numpy as np
+
+
+def _lines(rows, fmt):
+    """Format every row of a 2D array with fmt and join them into lines"""
+    return "\n".join(fmt.format(*row) for row in rows.tolist()) + "\n"
+
+
+def day1(n=1000, seed=0, drift=None):
+    """n frequency changes whose total is drift (small and random by default)
+
+    A small drift compared to the spread of the running sum makes part 2 take
+    many passes through the list.
+    """
+    if n < 2:
+        raise ValueError("day 1 needs at least 2 changes")
+    rng = np.random.default_rng(seed)
+    changes = rng.integers(1, 20, n) * rng.choice((-1, 1), n)
+    if drift is None:
+        drift = int(rng.integers(-20, 21))
+    # fix up the last change so that the total is the requested drift
+    changes[-1] += drift - changes.sum()
+    if changes[-1] == 0:
+        changes[-1] = 1
+        changes[-2] += -1
+    return "\n".join("{:+d}".format(c) for c in changes.tolist()) + "\n"
+
+
+def day2(n=250, seed=0, length=26):
+    """n random box IDs with exactly one planted pair differing by one character"""
+    if n < 2 or length < 1:
+        raise ValueError("day 2 needs at least 2 IDs of at least 1 letter for the planted pair")
+    rng = np.random.default_rng(seed)
+    letters = np.frombuffer(string.ascii_lowercase.encode(), np.uint8)
+    ids = letters[rng.integers(0, 26, (n, length))]
+    # the planted pair
+    i, j = rng.choice(n, 2, replace=False)
+    ids[j] = ids[i]
+    position = rng.integers(length)
+    ids[j, position] = letters[(ids[i, position] - letters[0] + rng.integers(1, 26)) % 26]
+    return "\n".join(row.tobytes().decode() for row in ids) + "\n"
+
+
+def day3(n=1000, seed=0, size=1000, max_side=30):
+    """n claims on a size x size fabric, at least one of them overlaps nothing
+
+    The lone claim goes in the bottom right corner, which is kept clear of
+    all the others. When n is too small for the fabric others will be alone
+    too.
+    """
+    if n < 1:
+        raise ValueError("day 3 needs at least 1 claim")
+    if max_side < 6 or size <= 2 * max_side:
+        raise ValueError("day 3 needs max_side of at least 6 and size over twice max_side")
+    rng = np.random.default_rng(seed)
+    # everything else stays left of this
+    limit = size - max_side - 1
+    width = rng.integers(5, max_side, n)
+    height = rng.integers(5, max_side, n)
+    left = rng.integers(0, limit - width)
+    top = rng.integers(0, size - height)
+    lone = rng.integers(n)
+    left[lone] = size - max_side
+    top[lone] = size - max_side
+    rows = np.stack((np.arange(1, n + 1), left, top, width, height), 1)
+    return _lines(rows, "#{} @ {},{}: {}x{}")
+
+
+def day4(n=1000, seed=0, guards=20):
+    """A shuffled log of n shifts shared between guards"""
+    if not 1 <= guards <= 3990:
+        raise ValueError("day 4 needs between 1 and 3990 guards")
+    rng = np.random.default_rng(seed)
+    guard_nums = rng.choice(np.arange(10, 4000), guards, replace=False)
+    start = datetime.datetime(1518, 1, 1)
+    lines = []
+    for shift in range(n):
+        midnight = start + datetime.timedelta(days=shift + 1)
+        # guards start a little before or after midnight
+        begin = midnight + datetime.timedelta(minutes=int(rng.integers(-10, 2)))
+        guard = guard_nums[rng.integers(guards)]
+        lines.append("[{:%Y-%m-%d %H:%M}] Guard #{} begins shift".format(begin, guard))
+        # naps happen during the midnight hour, after the guard arrives
+        earliest = begin.minute + 1 if begin >= midnight else 1
+        naps = 2 * int(rng.integers(0, 4))
+        minutes = np.sort(rng.choice(np.arange(earliest, 60), naps, replace=False))
+        for i, minute in enumerate(minutes.tolist()):
+            event = "wakes up" if i % 2 else "falls asleep"
+            time = midnight + datetime.timedelta(minutes=minute)
+            lines.append("[{:%Y-%m-%d %H:%M}] {}".format(time, event))
+    rng.shuffle(lines)
+    return "\n".join(lines) + "\n"
+
+
+def day5(n=50000, seed=0, p_react=0.4, alphabet=string.ascii_lowercase):
+    """A polymer of n units where each unit undoes the one before with probability p_react"""
+    if n < 1 or not alphabet:
+        raise ValueError("day 5 needs at least 1 unit and 1 letter")
+    rng = np.random.default_rng(seed)
+    lower = np.frombuffer(alphabet.encode(), np.uint8)
+    units = lower[rng.integers(0, len(lower), n)] ^ (32 * rng.integers(0, 2, n)).astype(np.uint8)
+    # flipping the case of the previous unit makes a pair that reacts
+    react = np.flatnonzero(rng.random(n - 1) < p_react) + 1
+    react = react[np.diff(react, prepend=-1) > 1]
+    units[react] = units[react - 1] ^ 32
+    return units.tobytes().decode() + "\n"
+
+
+def day6(n=50, seed=0, size=400):
+    """n coordinates in a size x size square"""
+    if not 1 <= n <= size * size:
+        raise ValueError("day 6 needs between 1 and size * size coordinates")
+    rng = np.random.default_rng(seed)
+    points = rng.choice(size * size, n, replace=False)
+    return _lines(np.stack(np.divmod(points, size), 1), "{}, {}")
+
+
+def step_names(n):
+    """Names for n steps, single letters as long as there are few enough"""
+    if n <= 26:
+        return list(string.ascii_uppercase[:n])
+    width = len(str(n - 1))
+    return ["S{:0{}d}".format(i, width) for i in range(n)]
+
+
+def day7(n=26, seed=0, edges_per_step=3):
+    """A random DAG of n steps, names are longer than one letter when n > 26"""
+    if n < 2:
+        raise ValueError("day 7 needs at least 2 steps to have an instruction")
+    rng = np.random.default_rng(seed)
+    names = step_names(n)
+    # a random order, edges only go forward so there are no cycles
+    order = rng.permutation(n)
+    m = n * edges_per_step
+    a = rng.integers(0, n - 1, m)
+    b = a + 1 + (rng.random(m) * (n - 1 - a)).astype(int)
+    pairs = np.unique(np.stack((order[a], order[b]), 1), axis=0)
+    rng.shuffle(pairs)
+    return "".join(
+        "Step {} must be finished before step {} can begin.\n".format(names[i], names[j])
+        for i, j in pairs.tolist()
+    )
+
+
+def day8(n=2000, seed=0, max_children=5, max_meta=5, max_depth=None):
+    """A license tree of n nodes
+
+    The tree is kept bushy (depth is about log n by default) like the real
+    input, the last few nodes may have fewer children than they asked for.
+    With max_children of 2 or less the depth isn't limited by default. A
+    node that would finish the tree early gets another child.
+    """
+    if n < 1 or max_meta < 1:
+        raise ValueError("day 8 needs at least 1 node with at least 1 metadata entry")
+    if max_depth is None:
+        if max_children <= 2:
+            max_depth = n
+        else:
+            max_depth = int(np.ceil(np.log(max(n, 2)) / np.log(max_children / 2))) + 2
+    # how many nodes a tree this wide and deep can have, as far as n
+    capacity, level = 0, 1
+    for depth in range(min(max_depth, n) + 1):
+        capacity += level
+        level *= max_children
+        if capacity >= n or not level:
+            break
+    if capacity < n:
+        raise ValueError(
+            "day 8 can't make {} nodes with max_children={} and max_depth={}".format(
+                n, max_children, max_depth
+            )
+        )
+    rng = np.random.default_rng(seed)
+    tokens = []
+    # stack of [index of header in tokens, children left to make, metadata count]
+    stack = []
+    made = 0
+    # children left to make over the whole stack
+    pending = 0
+
+    def new_node():
+        nonlocal made, pending
+        made += 1
+        if made < n and len(stack) < max_depth:
+            children = int(rng.integers(0, max_children + 1))
+        else:
+            children = 0
+        meta = int(rng.integers(1, max_meta + 1))
+        stack.append([len(tokens), children, meta])
+        pending += children
+        tokens.extend((0, meta))
+
+    new_node()
+    while stack:
+        node = stack[-1]
+        if made < n and not pending and tokens[node[0]] < max_children:
+            # nothing else is going to make the rest of the nodes
+            if len(stack) <= max_depth:
+                node[1] += 1
+                pending += 1
+        if node[1] and made < n:
+            node[1] -= 1
+            pending -= 1
+            tokens[node[0]] += 1
+            new_node()
+        else:
+            pending -= node[1]
+            stack.pop()
+            # metadata of nodes with children are (sometimes invalid) child indices
+            tokens.extend(rng.integers(1, max(tokens[node[0]], 1) + 2, node[2]).tolist())
+    return " ".join(map(str, tokens)) + "\n"
+
+
+def day9(n=72164, seed=0, players=None):
+    """A marble game with last marble n"""
+    rng = np.random.default_rng(seed)
+    if players is None:
+        players = int(rng.integers(9, 500))
+    return "{} players; last marble is worth {} points\n".format(players, n)
+
+
+def day18(n=50, seed=0):
+    """An n x n lumber collection area"""
+    rng = np.random.default_rng(seed)
+    acres = np.array(list(".|#"))[rng.choice(3, (n, n), p=(0.5, 0.3, 0.2))]
+    return "\n".join("".join(row) for row in acres) + "\n"
+
+
+def day23(n=1000, seed=0, scale=10**8):
+    """n nanobots with positions and radii of the order of scale"""
+    if scale < 1:
+        raise ValueError("day 23 needs a scale of at least 1")
+    rng = np.random.default_rng(seed)
+    pos = rng.integers(-scale, scale, (n, 3))
+    radius = rng.integers(scale // 2, scale, (n, 1))
+    return _lines(np.concatenate((pos, radius), 1), "pos=<{},{},{}>, r={}")
+
+
+def day25(n=1000, seed=0, spread=None):
+    """n 4D points in a hypercube spread wide, the default keeps the density of the real input"""
+    rng = np.random.default_rng(seed)
+    if spread is None:
+        spread = max(8, int(8 * (n / 1000) ** 0.25))
+    return _lines(rng.integers(-spread, spread + 1, (n, 4)), "{},{},{},{}")
+
+
+GENERATORS = {
+    int(name[3:]): func for name, func in list(globals().items()) if name.startswith("day")
+}
+
+
+def _options(parser, generator, pairs):
+    """Turn KEY=VALUE strings into keyword arguments for generator
+
+    Values are Python literals where they parse as one and strings otherwise.
+    """
+    names = list(inspect.signature(generator).parameters)[2:]
+    kwargs = {}
+    for pair in pairs:
+        key, sep, value = pair.partition("=")
+        if not sep or key not in names:
+            parser.error(
+                "bad option {!r}, {} takes {}".format(
+                    pair, generator.__name__, ", ".join(n + "=VALUE" for n in names) or "none"
+                )
+            )
+        try:
+            kwargs[key] = ast.literal_eval(value)
+        except (ValueError, SyntaxError):
+            kwargs[key] = value
+    return kwargs
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate a synthetic puzzle input")
+    parser.add_argument("day", type=int, choices=sorted(GENERATORS))
+    parser.add_argument("n", type=int, help="size of the problem")
+    parser.add_argument(
+        "options", nargs="*", metavar="KEY=VALUE", help="other generator arguments, e.g. size=10000"
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("-o", "--output", default=None, help="file to write (default stdout)")
+    args = parser.parse_args(argv)
+
+    generator = GENERATORS[args.day]
+    try:
+        text = generator(args.n, args.seed, **_options(parser, generator, args.options))
+    except ValueError as e:
+        parser.error(e)
+    if args.output is None:
+        sys.stdout.write(text)
+    else:
+        with open(args.output, "w") as fp:
+            fp.write(text)
+
+
+if __name__ == "__main__":
+    main()
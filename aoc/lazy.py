@@ -0,0 +1,63 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# lazy.py
+"""
+Keep the solvers quick to start
+
+matplotlib, networkx, scipy, pandas and tqdm each take hundreds of
+milliseconds to import, so the solvers get them through ``lazy_import``
+and only pay for them when they're actually used. Plots and progress bars
+are off unless asked for with the ``AOC_PLOT`` and ``AOC_PROGRESS``
+environment variables.
+"""
+
+import os
+import types
+import importlib
+
+# draw diagnostic plots
+PLOT = bool(os.environ.get("AOC_PLOT"))
+# show progress bars
+PROGRESS = bool(os.environ.get("AOC_PROGRESS"))
+
+
+class LazyModule(types.ModuleType):
+    """A stand in for a module that is only imported on first attribute access"""
+
+    def __getattr__(self, attr):
+        module = importlib.import_module(self.__name__)
+        # from now on look everything up directly
+        self.__dict__.update(module.__dict__)
+        return getattr(module, attr)
+
+
+def lazy_import(name):
+    """Import module name the first time it's used, e.g. `plt = lazy_import("matplotlib.pyplot")`"""
+    return LazyModule(name)
+
+
+def progress(iterable, **kwargs):
+    """Wrap iterable in a tqdm progress bar if progress bars are turned on"""
+    if PROGRESS:
+        import tqdm
+
+        return tqdm.tqdm(iterable, **kwargs)
+    return iterable
+
+
+def read_ints(filename, delimiter=",", ndmin=1):
+    """Read a file of integers, one row per line, without going through pandas
+
+    A single column comes back as a 1D array, more as a 2D array. A file of
+    rows needs ndmin=2 to stay 2D when it has only one line, like
+    pd.read_csv(...).values does.
+    """
+    import numpy as np
+
+    return np.loadtxt(filename, delimiter=delimiter, dtype=np.int64, ndmin=ndmin)
+
+
+def read_lines(filename):
+    """Read the non empty lines of a file as a list of strings"""
+    with open(filename, "r") as fp:
+        return [line for line in fp.read().splitlines() if line]